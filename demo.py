@@ -4,26 +4,75 @@ Investment Portfolio Tracker - Main Launcher
 Modern web interface (HTML/CSS/JS + Flask backend)
 """
 
+import importlib.util
 import sys
 import os
 import subprocess
 import traceback
 import signal
 
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(PROJECT_DIR, 'src')
+TESTS_DIR = os.path.join(PROJECT_DIR, 'tests')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+BANNER = "\n".join((
+    "=" * 75,
+    "    Investment Portfolio Tracker",
+    "=" * 75,
+    "Features:",
+    "   - Multi-currency support (EUR, USD, GBP, CHF, JPY)",
+    "   - Real-time prices (13,000+ crypto assets)",
+    "   - Modern web interface (opens in browser)",
+    "   - Searchable asset dropdown",
+    "   - Watchlist functionality",
+    "   - Portfolio composition charts",
+    "   - Transaction management",
+    "=" * 75,
+))
+
+# Sample holdings written by create_demo_portfolio()
+DEMO_ASSETS = (
+    {'symbol': 'AAPL', 'name': 'Apple Inc.', 'asset_type': 'stock', 'platform': 'Demo Broker'},
+    {'symbol': 'MSFT', 'name': 'Microsoft Corporation', 'asset_type': 'stock', 'platform': 'Demo Broker'},
+    {'symbol': 'VWCE.DE', 'name': 'Vanguard FTSE All-World UCITS ETF', 'asset_type': 'etf', 'platform': 'Demo Broker'},
+    {'symbol': 'BTC', 'name': 'Bitcoin', 'asset_type': 'crypto', 'platform': 'Demo Exchange'},
+    {'symbol': 'ETH', 'name': 'Ethereum', 'asset_type': 'crypto', 'platform': 'Demo Exchange'},
+)
+
+DEMO_TRANSACTIONS = (
+    {'asset_symbol': 'AAPL', 'transaction_type': 'buy', 'amount': 10, 'price_per_unit': 150.0,
+     'fees': 1.0, 'transaction_date': '2024-01-15 10:00:00'},
+    {'asset_symbol': 'MSFT', 'transaction_type': 'buy', 'amount': 5, 'price_per_unit': 340.0,
+     'fees': 1.0, 'transaction_date': '2024-02-01 10:00:00'},
+    {'asset_symbol': 'VWCE.DE', 'transaction_type': 'buy', 'amount': 20, 'price_per_unit': 105.0,
+     'fees': 1.5, 'transaction_date': '2024-02-15 10:00:00'},
+    {'asset_symbol': 'BTC', 'transaction_type': 'buy', 'amount': 0.05, 'price_per_unit': 40000.0,
+     'fees': 2.0, 'transaction_date': '2024-03-01 10:00:00'},
+    {'asset_symbol': 'ETH', 'transaction_type': 'buy', 'amount': 1.0, 'price_per_unit': 2200.0,
+     'fees': 2.0, 'transaction_date': '2024-03-10 10:00:00'},
+    {'asset_symbol': 'AAPL', 'transaction_type': 'dividend', 'amount': 10, 'price_per_unit': 0.24,
+     'transaction_date': '2024-05-16 10:00:00'},
+    {'asset_symbol': 'AAPL', 'transaction_type': 'sell', 'amount': 3, 'price_per_unit': 190.0,
+     'fees': 1.0, 'transaction_date': '2024-06-20 10:00:00'},
+)
+
+# Third-party packages checked at startup (import names, not pip names)
+REQUIRED_PACKAGES = ('flask', 'requests', 'yfinance')
+
+MENU = "\n".join((
+    "\nOptions:",
+    "   [1] Launch Web Interface",
+    "   [2] Run Tests",
+    "   [3] Create Demo Portfolio",
+    "   [0] Exit",
+))
+
+
 def print_banner():
     """Print application banner"""
-    print("=" * 75)
-    print("    Investment Portfolio Tracker")
-    print("=" * 75)
-    print("Features:")
-    print("   - Multi-currency support (EUR, USD, GBP, CHF, JPY)")
-    print("   - Real-time prices (13,000+ crypto assets)")
-    print("   - Modern web interface (opens in browser)")
-    print("   - Searchable asset dropdown")
-    print("   - Watchlist functionality")
-    print("   - Portfolio composition charts")
-    print("   - Transaction management")
-    print("=" * 75)
+    print(BANNER)
 
 
 def kill_existing_servers():
@@ -69,24 +118,21 @@ def test_dependencies():
     """Test core dependencies"""
     print("\nTesting Dependencies...")
     
+    # Only locate the packages; importing yfinance here would slow every launch
+    missing = [name for name in REQUIRED_PACKAGES if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"- Missing: {', '.join(missing)}")
+        return False
+    
     try:
-        sys.path.append('src')
-        
         from backend import InvestmentTracker
         print("+ Backend module")
-        
-        from flask import Flask
-        print("+ Flask")
-        
-        import requests
-        import yfinance
-        import pandas
-        print("+ All dependencies available")
-        
-        return True
     except ImportError as e:
         print(f"- Missing: {e}")
         return False
+    
+    print("+ All dependencies available")
+    return True
 
 
 def launch_web_interface():
@@ -99,7 +145,6 @@ def launch_web_interface():
         print("   (Cleaned up old server)")
     
     try:
-        sys.path.append('src')
         from web_frontend import main
         main()
     except Exception as e:
@@ -115,24 +160,16 @@ def run_test_suite():
     print("-" * 50)
     
     try:
-        test_runner = os.path.join('tests', 'run_all_tests.py')
-        if not os.path.exists(test_runner):
+        # Run discovery in this interpreter instead of spawning a new one
+        if TESTS_DIR not in sys.path:
+            sys.path.insert(0, TESTS_DIR)
+        try:
+            from run_all_tests import run_all_tests
+        except ImportError:
             print("Test runner not found")
             return False
+        return run_all_tests()
         
-        result = subprocess.run([sys.executable, test_runner], 
-                              capture_output=True, text=True, timeout=300)
-        
-        print(result.stdout)
-        if result.stderr:
-            print("Warnings/Errors:")
-            print(result.stderr)
-        
-        return result.returncode == 0
-        
-    except subprocess.TimeoutExpired:
-        print("Test suite timed out")
-        return False
     except Exception as e:
         print(f"Test suite failed: {e}")
         return False
@@ -142,21 +179,26 @@ def create_demo_portfolio():
     """Create a demonstration portfolio"""
     print("\nCreating Demo Portfolio...")
     
+    db_path = os.path.join(PROJECT_DIR, 'demo_portfolio.db')
+    if os.path.exists(db_path):
+        print(f"Demo portfolio already exists: {db_path}")
+        return True
+    
     try:
-        demo_script = os.path.join('tests', 'test_comprehensive.py')
-        result = subprocess.run([sys.executable, demo_script], 
-                              capture_output=True, text=True, timeout=120)
+        from backend import InvestmentTracker
+        
+        tracker = InvestmentTracker(db_path)
+        try:
+            assets_ok = tracker.add_assets_bulk(DEMO_ASSETS)
+            transactions_ok = tracker.add_transactions_bulk(DEMO_TRANSACTIONS)
+        finally:
+            tracker.close()
+        
+        print(f"+ {sum(assets_ok)} assets, {sum(transactions_ok)} transactions")
+        print(f"Demo portfolio created: {db_path}")
+        print("Load it from the database menu in the web interface.")
+        return all(assets_ok) and all(transactions_ok)
         
-        if result.returncode == 0:
-            print("Demo portfolio created!")
-            print(result.stdout)
-            return True
-        else:
-            print("Demo portfolio creation failed")
-            if result.stderr:
-                print(result.stderr)
-            return False
-            
     except Exception as e:
         print(f"Demo creation failed: {e}")
         return False
@@ -167,17 +209,13 @@ def main():
     
     if not test_dependencies():
         print("\nMissing dependencies!")
-        print("Run: pip install Flask Flask-CORS pandas yfinance requests")
+        print("Run: pip install Flask yfinance requests")
         return 1
     
     print("\n+ Ready!")
     
     while True:
-        print("\nOptions:")
-        print("   [1] Launch Web Interface")
-        print("   [2] Run Tests")
-        print("   [3] Create Demo Portfolio")
-        print("   [0] Exit")
+        print(MENU)
         
         try:
             choice = input("\nChoice (0-3): ").strip()
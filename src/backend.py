@@ -1,12 +1,19 @@
 import datetime
+import json
+import os
+import queue
 import sqlite3
-import yfinance as yf
+import tempfile
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
-import pandas as pd
 import time
 import logging
 import re
-from typing import Optional, List, Dict, Tuple
+from contextlib import contextmanager
+from itertools import islice
+from typing import Callable, Iterator, Optional, List, Dict, Tuple
 
 # This script holds all backend functions for the investment book
 
@@ -21,6 +28,11 @@ def safe_print(msg):
     except (IOError, OSError):
         logger.info(msg)
 
+# yfinance pulls in pandas/numpy, so load it on first price lookup rather than at import
+def _ticker(symbol):
+    import yfinance as yf
+    return yf.Ticker(symbol)
+
 
 # ============== Constants ==============
 
@@ -33,6 +45,56 @@ MAX_NOTES_LENGTH = 500
 SYMBOL_PATTERN = re.compile(r'^[A-Za-z0-9._\-]{1,20}$')
 PRICE_HISTORY_RETENTION_DAYS = 365
 CRYPTO_CACHE_TTL_SECONDS = 3600
+# The CoinGecko symbol map is also kept on disk so restarts skip the ~1.5 MB download
+CRYPTO_DISK_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'investment_tracker', 'coins_list.json')
+CRYPTO_DISK_CACHE_TTL_SECONDS = 24 * 3600
+PRICE_FETCH_MAX_WORKERS = 10
+MONEY_DECIMALS = 2  # EUR cents
+SEARCH_RESULT_LIMIT = 50
+# CoinGecko free tier: ~30 requests/minute, shared by every thread in the process
+COINGECKO_REQUESTS_PER_MINUTE = 30
+COINGECKO_BURST = 5
+
+# Applied to every connection; journal_mode=WAL is persistent and set once at init
+CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA cache_size = -20000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+)
+
+# Hot-path statements. sqlite3 caches compiled statements per connection keyed
+# by SQL text, so pooled connections reuse these instead of re-preparing them.
+SQL_ASSET_EXISTS = "SELECT symbol FROM assets WHERE symbol = ?"
+SQL_INSERT_ASSET = '''
+    INSERT OR REPLACE INTO assets (symbol, name, asset_type, platform)
+    VALUES (?, ?, ?, ?)
+'''
+SQL_INSERT_TRANSACTION = '''
+    INSERT INTO transactions
+    (asset_symbol, transaction_type, amount, price_per_unit, total_value, fees, platform, transaction_date, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+SQL_UPDATE_PRICE = '''
+    UPDATE assets SET current_price = ?, last_updated = CURRENT_TIMESTAMP
+    WHERE symbol = ?
+'''
+SQL_INSERT_PRICE_HISTORY = "INSERT INTO price_history (asset_symbol, price) VALUES (?, ?)"
+
+# One writer serializes writes; readers run in parallel under WAL
+READER_POOL_SIZE = os.cpu_count() or 4
+# How often a thread waiting on a full pool re-checks whether the pool was closed
+POOL_WAIT_POLL_SECONDS = 0.1
+
+# Yahoo Finance tickers quoting each supported currency against EUR
+CURRENCY_PAIRS = {
+    'USD': 'EURUSD=X',
+    'GBP': 'EURGBP=X',
+    'CHF': 'EURCHF=X',
+    'JPY': 'EURJPY=X',
+}
 
 # Fallback exchange rates (approximate, used only when API fails)
 FALLBACK_RATES = {
@@ -67,87 +129,320 @@ PRIORITY_CRYPTO_MAPPING = {
     'SHIB': 'shiba-inu',
 }
 
+POPULAR_ASSETS = (
+    # Popular Stocks
+    {'symbol': 'AAPL', 'name': 'Apple Inc.', 'asset_type': 'stock'},
+    {'symbol': 'MSFT', 'name': 'Microsoft Corporation', 'asset_type': 'stock'},
+    {'symbol': 'GOOGL', 'name': 'Alphabet Inc.', 'asset_type': 'stock'},
+    {'symbol': 'AMZN', 'name': 'Amazon.com Inc.', 'asset_type': 'stock'},
+    {'symbol': 'TSLA', 'name': 'Tesla Inc.', 'asset_type': 'stock'},
+    {'symbol': 'NVDA', 'name': 'NVIDIA Corporation', 'asset_type': 'stock'},
+    {'symbol': 'META', 'name': 'Meta Platforms Inc.', 'asset_type': 'stock'},
+    # Popular ETFs
+    {'symbol': 'VWCE.DE', 'name': 'Vanguard FTSE All-World UCITS ETF', 'asset_type': 'etf'},
+    {'symbol': 'SPY', 'name': 'SPDR S&P 500 ETF Trust', 'asset_type': 'etf'},
+    {'symbol': 'QQQ', 'name': 'Invesco QQQ Trust', 'asset_type': 'etf'},
+    {'symbol': 'VTI', 'name': 'Vanguard Total Stock Market ETF', 'asset_type': 'etf'},
+    {'symbol': 'IWDA.AS', 'name': 'iShares Core MSCI World UCITS ETF', 'asset_type': 'etf'},
+    # Popular Cryptos
+    {'symbol': 'BTC', 'name': 'Bitcoin', 'asset_type': 'crypto'},
+    {'symbol': 'ETH', 'name': 'Ethereum', 'asset_type': 'crypto'},
+    {'symbol': 'SOL', 'name': 'Solana', 'asset_type': 'crypto'},
+    {'symbol': 'ADA', 'name': 'Cardano', 'asset_type': 'crypto'},
+    {'symbol': 'DOT', 'name': 'Polkadot', 'asset_type': 'crypto'},
+    {'symbol': 'AVAX', 'name': 'Avalanche', 'asset_type': 'crypto'},
+    {'symbol': 'MATIC', 'name': 'Polygon', 'asset_type': 'crypto'},
+    {'symbol': 'LINK', 'name': 'Chainlink', 'asset_type': 'crypto'},
+)
+
+
+class ConnectionPool:
+    """A thread-safe pool of up to `size` SQLite connections, opened on demand."""
+
+    def __init__(self, factory: Callable[[], sqlite3.Connection], size: int):
+        self._factory = factory
+        self._size = size
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _acquire(self) -> sqlite3.Connection:
+        if self._closed:
+            return self._factory()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_create = self._created < self._size
+            if can_create:
+                self._created += 1
+        if not can_create:
+            while True:
+                try:
+                    return self._idle.get(timeout=POOL_WAIT_POLL_SECONDS)
+                except queue.Empty:
+                    # Borrowed connections are closed, not queued, after close(); don't wait for them
+                    if self._closed:
+                        return self._factory()
+        try:
+            return self._factory()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _release(self, conn: sqlite3.Connection):
+        if self._closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection for the duration of the with-block."""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def close(self):
+        """Close idle connections; borrowed ones are closed when returned."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class RateLimiter:
+    """Thread-safe token bucket: `rate` requests per second, bursts of up to `capacity`.
+
+    Callers reserve a token under the lock and sleep outside it, so each one
+    waits only as long as its own slot requires.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until it is available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+COINGECKO_LIMITER = RateLimiter(COINGECKO_REQUESTS_PER_MINUTE / 60, COINGECKO_BURST)
+
 
 class InvestmentTracker:
+    # The CoinGecko symbol map is the same for every database, so share it process-wide
+    _crypto_symbols_cache: Optional[Dict[str, str]] = None
+    _cache_timestamp: Optional[datetime.datetime] = None
+    # Where the symbol map is persisted between runs; None disables the disk cache
+    crypto_cache_path: Optional[str] = CRYPTO_DISK_CACHE_FILE
+
     def __init__(self, db_path: str = "my_assets.db"):
         self.db_path = db_path
-        self._crypto_symbols_cache: Optional[Dict[str, str]] = None
-        self._cache_timestamp: Optional[datetime.datetime] = None
+        self._local = threading.local()
+        self._writer_pool = ConnectionPool(self._get_connection, 1)
+        if db_path == ':memory:':
+            # Every connection to :memory: is a separate database, so share the writer
+            self._reader_pool = self._writer_pool
+        else:
+            self._reader_pool = ConnectionPool(lambda: self._get_connection(read_only=True),
+                                               READER_POOL_SIZE)
         self.initialize_database()
 
     # ============== Database Setup ==============
 
-    def _get_connection(self) -> sqlite3.Connection:
-        """Get a database connection with foreign keys enabled."""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA foreign_keys = ON")
+    def _get_connection(self, read_only: bool = False) -> sqlite3.Connection:
+        """Get a tuned database connection with foreign keys enabled.
+
+        Writes start with BEGIN IMMEDIATE so concurrent writers wait on the
+        busy timeout up front instead of failing mid-transaction.
+        """
+        if read_only:
+            uri = f"file:{urllib.request.pathname2url(os.path.abspath(self.db_path))}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_path, isolation_level='IMMEDIATE', check_same_thread=False)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
         return conn
 
+    @contextmanager
+    def _write_conn(self) -> Iterator[sqlite3.Connection]:
+        """Borrow the writer connection; commits on success, rolls back on error.
+
+        Nested use on the same thread joins the outer transaction under a
+        SAVEPOINT, so a nested block that fails is undone on its own even if
+        the caller swallows the error and the outer transaction commits.
+        """
+        conn = getattr(self._local, 'write_conn', None)
+        if conn is not None:
+            if not conn.in_transaction:
+                # A SAVEPOINT outside BEGIN would commit on RELEASE, ending the outer transaction early
+                conn.execute("BEGIN IMMEDIATE")
+            depth = self._local.savepoint_depth = getattr(self._local, 'savepoint_depth', 0) + 1
+            name = f"nested_{depth}"
+            conn.execute(f"SAVEPOINT {name}")
+            try:
+                yield conn
+            except BaseException:
+                # Some errors make SQLite abort the whole transaction, savepoints included
+                if conn.in_transaction:
+                    conn.execute(f"ROLLBACK TO {name}")
+                raise
+            finally:
+                if conn.in_transaction:
+                    conn.execute(f"RELEASE {name}")
+                self._local.savepoint_depth = depth - 1
+            return
+
+        with self._writer_pool.connection() as conn:
+            self._local.write_conn = conn
+            self._local.deferred_prices = deferred = []
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                self._local.write_conn = None
+
+        # Prices for assets added inside the transaction, fetched once the writer is free again
+        if deferred:
+            self._update_prices(deferred)
+
+    @contextmanager
+    def _read_conn(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection (or this thread's open write transaction)."""
+        conn = getattr(self._local, 'write_conn', None)
+        if conn is not None:
+            yield conn
+            return
+
+        with self._reader_pool.connection() as conn:
+            yield conn
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Group several write calls into one transaction (and one WAL sync).
+
+        add_asset/add_transaction/... called inside the block commit together
+        when it exits, or are all rolled back if it raises. A call that fails
+        and reports it by returning False leaves no partial writes behind.
+        Prices for assets added in the block are fetched after the commit.
+        """
+        with self._write_conn():
+            yield
+
+    def _fetch_dicts(self, query: str, params: Tuple = ()) -> List[Dict]:
+        """Run a read query and return its rows as plain dicts."""
+        with self._read_conn() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            return [dict(row) for row in cursor.execute(query, params)]
+
+    def close(self):
+        """Refresh planner statistics, then close all pooled database connections."""
+        try:
+            with self._write_conn() as conn:
+                conn.execute("PRAGMA optimize")
+        except sqlite3.Error as e:
+            safe_print(f"Error optimizing database: {e}")
+        self._writer_pool.close()
+        if self._reader_pool is not self._writer_pool:
+            self._reader_pool.close()
+
     def initialize_database(self):
         """Initialize a SQL-based database to track investments."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        with self._write_conn() as conn:
+            cursor = conn.cursor()
 
-        # Create assets table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS assets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                symbol TEXT UNIQUE NOT NULL,
-                name TEXT NOT NULL,
-                asset_type TEXT NOT NULL,
-                platform TEXT,
-                current_price REAL DEFAULT 0.0,
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Create transactions table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS transactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                asset_symbol TEXT NOT NULL,
-                transaction_type TEXT NOT NULL,
-                amount REAL NOT NULL,
-                price_per_unit REAL NOT NULL,
-                total_value REAL NOT NULL,
-                fees REAL DEFAULT 0.0,
-                platform TEXT,
-                transaction_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                notes TEXT,
-                FOREIGN KEY (asset_symbol) REFERENCES assets (symbol) ON DELETE CASCADE
-            )
-        ''')
-
-        # Create price_history table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS price_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                asset_symbol TEXT NOT NULL,
-                price REAL NOT NULL,
-                date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (asset_symbol) REFERENCES assets (symbol) ON DELETE CASCADE
-            )
-        ''')
-
-        # Create watchlist table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS watchlist (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                asset_symbol TEXT UNIQUE NOT NULL,
-                added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                notes TEXT,
-                FOREIGN KEY (asset_symbol) REFERENCES assets (symbol) ON DELETE CASCADE
-            )
-        ''')
-
-        # Create indexes for commonly queried columns
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_transactions_asset ON transactions(asset_symbol)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_price_history_asset ON price_history(asset_symbol)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_price_history_date ON price_history(date)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_watchlist_asset ON watchlist(asset_symbol)')
-
-        conn.commit()
-        conn.close()
+            # WAL lets readers proceed while a write is in progress
+            cursor.execute("PRAGMA journal_mode = WAL")
+
+            # Create assets table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS assets (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    symbol TEXT UNIQUE NOT NULL,
+                    name TEXT NOT NULL,
+                    asset_type TEXT NOT NULL,
+                    platform TEXT,
+                    current_price REAL DEFAULT 0.0,
+                    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+
+            # Create transactions table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS transactions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    asset_symbol TEXT NOT NULL,
+                    transaction_type TEXT NOT NULL,
+                    amount REAL NOT NULL,
+                    price_per_unit REAL NOT NULL,
+                    total_value REAL NOT NULL,
+                    fees REAL DEFAULT 0.0,
+                    platform TEXT,
+                    transaction_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    notes TEXT,
+                    FOREIGN KEY (asset_symbol) REFERENCES assets (symbol) ON DELETE CASCADE
+                )
+            ''')
+
+            # Create price_history table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS price_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    asset_symbol TEXT NOT NULL,
+                    price REAL NOT NULL,
+                    date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (asset_symbol) REFERENCES assets (symbol) ON DELETE CASCADE
+                )
+            ''')
+
+            # Create watchlist table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS watchlist (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    asset_symbol TEXT UNIQUE NOT NULL,
+                    added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    notes TEXT,
+                    FOREIGN KEY (asset_symbol) REFERENCES assets (symbol) ON DELETE CASCADE
+                )
+            ''')
+
+            # Create indexes for commonly queried columns
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(transaction_date)')
+            # Walked in reverse for ORDER BY transaction_date DESC, id DESC (the rowid follows the
+            # indexed columns); it also serves plain asset lookups, replacing idx_transactions_asset
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_transactions_asset_date ON transactions(asset_symbol, transaction_date)')
+            cursor.execute('DROP INDEX IF EXISTS idx_transactions_asset')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_price_history_asset ON price_history(asset_symbol)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_price_history_date ON price_history(date)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_watchlist_asset ON watchlist(asset_symbol)')
+
+            # Gather planner statistics once; close() keeps them fresh via PRAGMA optimize
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                cursor.execute("ANALYZE")
 
     # ============== Input Validation ==============
 
@@ -211,19 +506,12 @@ class InvestmentTracker:
             return 1.0
 
         currency = currency.upper()
-        conversion_pairs = {
-            'USD': 'EURUSD=X',
-            'GBP': 'EURGBP=X',
-            'CHF': 'EURCHF=X',
-            'JPY': 'EURJPY=X',
-        }
-
-        pair = conversion_pairs.get(currency, 'EURUSD=X')
-        if currency not in conversion_pairs:
+        pair = CURRENCY_PAIRS.get(currency, CURRENCY_PAIRS['USD'])
+        if currency not in CURRENCY_PAIRS:
             safe_print(f"Unknown currency {currency}, assuming USD")
 
         try:
-            eur_rate_ticker = yf.Ticker(pair)
+            eur_rate_ticker = _ticker(pair)
             eur_rate_hist = eur_rate_ticker.history(period="1d")
             if not eur_rate_hist.empty:
                 exchange_rate = eur_rate_hist['Close'].iloc[-1]
@@ -254,11 +542,16 @@ class InvestmentTracker:
     # ============== API Helpers ==============
 
     def _fetch_with_backoff(self, url: str, max_retries: int = 3, initial_delay: float = 2.0,
-                            timeout: int = 10) -> Optional[requests.Response]:
-        """Fetch a URL with exponential backoff on 429 (rate limit) responses."""
+                            timeout: int = 10, limiter: Optional[RateLimiter] = None) -> Optional[requests.Response]:
+        """Fetch a URL with exponential backoff on 429 (rate limit) responses.
+
+        If a `limiter` is given, every attempt waits for one of its tokens first.
+        """
         delay = initial_delay
         for attempt in range(max_retries):
             try:
+                if limiter is not None:
+                    limiter.acquire()
                 response = requests.get(url, timeout=timeout)
                 if response.status_code == 200:
                     return response
@@ -281,41 +574,83 @@ class InvestmentTracker:
 
     # ============== Asset Operations ==============
 
+    def _prepare_asset(self, symbol: str, name: str, asset_type: str, platform: str = None) -> Tuple:
+        """Validate asset fields and return the row to insert. Raises ValueError."""
+        return (self._validate_symbol(symbol), self._validate_name(name),
+                self._validate_asset_type(asset_type), self._validate_platform(platform))
+
     def add_asset(self, symbol: str, name: str, asset_type: str, platform: str = None) -> bool:
         """Add a new asset to the database."""
         try:
-            symbol = self._validate_symbol(symbol)
-            name = self._validate_name(name)
-            asset_type = self._validate_asset_type(asset_type)
-            platform = self._validate_platform(platform)
+            symbol, name, asset_type, platform = self._prepare_asset(symbol, name, asset_type, platform)
         except ValueError as e:
             safe_print(f"Validation error adding asset: {e}")
             return False
 
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR REPLACE INTO assets (symbol, name, asset_type, platform)
-                VALUES (?, ?, ?, ?)
-            ''', (symbol, name, asset_type, platform))
-            conn.commit()
-            conn.close()
+            with self._write_conn() as conn:
+                conn.execute(SQL_INSERT_ASSET, (symbol, name, asset_type, platform))
 
-            # Update price immediately after adding
-            self.update_single_asset_price(symbol, asset_type)
+            if getattr(self._local, 'write_conn', None) is not None:
+                # Inside a batch: don't hold the writer over the network
+                self._local.deferred_prices.append((symbol, asset_type))
+            else:
+                # Update price immediately after adding
+                self.update_single_asset_price(symbol, asset_type)
             return True
         except Exception as e:
             safe_print(f"Error adding asset: {e}")
             return False
 
+    def add_assets_bulk(self, assets: List[Dict], update_prices: bool = True) -> List[bool]:
+        """Add many assets with a single INSERT statement and one commit.
+
+        Each item takes the keyword arguments of add_asset. Invalid rows are
+        skipped; returns one success flag per input item. Prices for the new
+        assets are then fetched concurrently unless `update_prices` is False.
+        """
+        results = [False] * len(assets)
+        rows = []
+        for i, asset in enumerate(assets):
+            try:
+                rows.append(self._prepare_asset(**asset))
+                results[i] = True
+            except (TypeError, ValueError) as e:
+                safe_print(f"Validation error in asset {i + 1}: {e}")
+        if not rows:
+            return results
+
+        try:
+            with self._write_conn() as conn:
+                conn.executemany(SQL_INSERT_ASSET, rows)
+        except Exception as e:
+            safe_print(f"Error adding assets: {e}")
+            return [False] * len(assets)
+
+        if update_prices:
+            added = [(symbol, asset_type) for symbol, _, asset_type, _ in rows]
+            if getattr(self._local, 'write_conn', None) is not None:
+                # Inside a batch: fetched once it commits
+                self._local.deferred_prices.extend(added)
+            else:
+                self._update_prices(added)
+        return results
+
     def get_all_assets(self) -> List[Dict]:
         """Get all assets in the database."""
-        conn = self._get_connection()
         query = "SELECT * FROM assets ORDER BY symbol"
-        df = pd.read_sql_query(query, conn)
-        conn.close()
-        return df.to_dict('records') if not df.empty else []
+        return self._fetch_dicts(query)
+
+    def get_asset_type(self, symbol: str) -> Optional[str]:
+        """Get an asset's type by symbol, or None if it does not exist."""
+        try:
+            symbol = self._validate_symbol(symbol)
+        except ValueError:
+            return None
+
+        with self._read_conn() as conn:
+            row = conn.execute("SELECT asset_type FROM assets WHERE symbol = ? LIMIT 1", (symbol,)).fetchone()
+        return row[0] if row else None
 
     def delete_asset(self, symbol: str) -> bool:
         """Delete an asset and all its related data atomically."""
@@ -326,20 +661,13 @@ class InvestmentTracker:
             return False
 
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            # Use a transaction for atomicity
-            cursor.execute("BEGIN")
-            try:
+            # All deletes share one transaction for atomicity
+            with self._write_conn() as conn:
+                cursor = conn.cursor()
                 cursor.execute("DELETE FROM transactions WHERE asset_symbol = ?", (symbol,))
                 cursor.execute("DELETE FROM price_history WHERE asset_symbol = ?", (symbol,))
                 cursor.execute("DELETE FROM watchlist WHERE asset_symbol = ?", (symbol,))
                 cursor.execute("DELETE FROM assets WHERE symbol = ?", (symbol,))
-                conn.commit()
-            except Exception:
-                conn.rollback()
-                raise
-            conn.close()
             return True
         except Exception as e:
             safe_print(f"Error deleting asset {symbol}: {e}")
@@ -358,103 +686,172 @@ class InvestmentTracker:
         ''', (symbol,))
         return cursor.fetchone()[0]
 
-    def add_transaction(self, asset_symbol: str, transaction_type: str, amount: float,
-                        price_per_unit: float, fees: float = 0.0, platform: str = None,
-                        transaction_date: str = None, notes: str = None) -> bool:
-        """Add a transaction to the database with full validation."""
-        try:
-            asset_symbol = self._validate_symbol(asset_symbol)
-            transaction_type = self._validate_transaction_type(transaction_type)
-            platform = self._validate_platform(platform)
-            notes = self._validate_notes(notes)
-        except ValueError as e:
-            safe_print(f"Validation error: {e}")
-            return False
+    def _prepare_transaction(self, asset_symbol: str, transaction_type: str, amount: float,
+                             price_per_unit: float, fees: float = 0.0, platform: str = None,
+                             transaction_date: str = None, notes: str = None) -> Tuple:
+        """Validate transaction fields and return the row to insert. Raises ValueError."""
+        asset_symbol = self._validate_symbol(asset_symbol)
+        transaction_type = self._validate_transaction_type(transaction_type)
+        platform = self._validate_platform(platform)
+        notes = self._validate_notes(notes)
 
         if not isinstance(amount, (int, float)) or amount <= 0:
-            safe_print(f"Error: Amount must be positive, got {amount}")
-            return False
+            raise ValueError(f"Amount must be positive, got {amount}")
 
         if not isinstance(price_per_unit, (int, float)) or price_per_unit <= 0:
-            safe_print(f"Error: Price per unit must be positive, got {price_per_unit}")
-            return False
+            raise ValueError(f"Price per unit must be positive, got {price_per_unit}")
 
         if fees is None:
             fees = 0.0
         if not isinstance(fees, (int, float)) or fees < 0:
-            safe_print(f"Error: Fees must be non-negative, got {fees}")
+            raise ValueError(f"Fees must be non-negative, got {fees}")
+
+        total_value = amount * price_per_unit
+        if transaction_date is None:
+            transaction_date = datetime.datetime.now().isoformat()
+
+        return (asset_symbol, transaction_type, amount, price_per_unit, total_value,
+                fees, platform, transaction_date, notes)
+
+    def add_transaction(self, asset_symbol: str, transaction_type: str, amount: float,
+                        price_per_unit: float, fees: float = 0.0, platform: str = None,
+                        transaction_date: str = None, notes: str = None) -> bool:
+        """Add a transaction to the database with full validation."""
+        try:
+            row = self._prepare_transaction(asset_symbol, transaction_type, amount, price_per_unit,
+                                            fees, platform, transaction_date, notes)
+        except ValueError as e:
+            safe_print(f"Validation error: {e}")
             return False
+        asset_symbol, transaction_type, amount = row[:3]
 
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
+            with self._write_conn() as conn:
+                cursor = conn.cursor()
 
-            # Validate that the asset exists
-            cursor.execute("SELECT symbol FROM assets WHERE symbol = ?", (asset_symbol,))
-            if not cursor.fetchone():
-                safe_print(f"Error: Asset {asset_symbol} does not exist. Please add the asset first.")
-                conn.close()
-                return False
-
-            # Validate sell does not exceed holdings
-            if transaction_type == 'sell':
-                current_holdings = self._get_current_holdings(cursor, asset_symbol)
-                if amount > current_holdings + 1e-9:  # small epsilon for float comparison
-                    safe_print(f"Error: Cannot sell {amount} of {asset_symbol}, only {current_holdings:.8f} held")
-                    conn.close()
+                # Validate that the asset exists
+                cursor.execute(SQL_ASSET_EXISTS, (asset_symbol,))
+                if not cursor.fetchone():
+                    safe_print(f"Error: Asset {asset_symbol} does not exist. Please add the asset first.")
                     return False
 
-            total_value = amount * price_per_unit
-            if transaction_date is None:
-                transaction_date = datetime.datetime.now().isoformat()
-
-            cursor.execute('''
-                INSERT INTO transactions
-                (asset_symbol, transaction_type, amount, price_per_unit, total_value, fees, platform, transaction_date, notes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (asset_symbol, transaction_type, amount, price_per_unit, total_value, fees, platform, transaction_date, notes))
+                # Validate sell does not exceed holdings
+                if transaction_type == 'sell':
+                    current_holdings = self._get_current_holdings(cursor, asset_symbol)
+                    if amount > current_holdings + 1e-9:  # small epsilon for float comparison
+                        safe_print(f"Error: Cannot sell {amount} of {asset_symbol}, only {current_holdings:.8f} held")
+                        return False
 
-            conn.commit()
-            conn.close()
+                cursor.execute(SQL_INSERT_TRANSACTION, row)
             return True
         except Exception as e:
             safe_print(f"Error adding transaction: {e}")
             return False
 
-    def get_transactions(self, asset_symbol: str = None) -> List[Dict]:
-        """Get all transactions or transactions for a specific asset."""
-        conn = self._get_connection()
+    def add_transactions_bulk(self, transactions: List[Dict]) -> List[bool]:
+        """Add many transactions with a single INSERT statement and one commit.
 
-        if asset_symbol:
+        Each item takes the keyword arguments of add_transaction. Invalid rows are
+        skipped; returns one success flag per input item.
+        """
+        results = [False] * len(transactions)
+        prepared = []
+        for i, tx in enumerate(transactions):
             try:
-                asset_symbol = self._validate_symbol(asset_symbol)
-            except ValueError:
-                conn.close()
-                return []
-            query = '''
-                SELECT * FROM transactions
-                WHERE asset_symbol = ?
-                ORDER BY transaction_date DESC
-            '''
-            df = pd.read_sql_query(query, conn, params=(asset_symbol,))
-        else:
-            query = '''
-                SELECT * FROM transactions
-                ORDER BY transaction_date DESC
-            '''
-            df = pd.read_sql_query(query, conn)
+                prepared.append((i, self._prepare_transaction(**tx)))
+            except (TypeError, ValueError) as e:
+                safe_print(f"Validation error in transaction {i + 1}: {e}")
+        if not prepared:
+            return results
 
-        conn.close()
-        return df.to_dict('records') if not df.empty else []
+        try:
+            with self._write_conn() as conn:
+                cursor = conn.cursor()
+
+                symbols = sorted({row[0] for _, row in prepared})
+                placeholders = ', '.join('?' * len(symbols))
+                cursor.execute(f"SELECT symbol FROM assets WHERE symbol IN ({placeholders})", symbols)
+                existing = {r[0] for r in cursor.fetchall()}
+
+                # Track holdings as the batch is applied so sells see earlier buys
+                holdings: Dict[str, float] = {}
+                rows = []
+                for i, row in prepared:
+                    asset_symbol, transaction_type, amount = row[:3]
+                    if asset_symbol not in existing:
+                        safe_print(f"Error: Asset {asset_symbol} does not exist. Please add the asset first.")
+                        continue
+                    if transaction_type in ('buy', 'sell') and asset_symbol not in holdings:
+                        holdings[asset_symbol] = self._get_current_holdings(cursor, asset_symbol)
+                    if transaction_type == 'sell':
+                        if amount > holdings[asset_symbol] + 1e-9:
+                            safe_print(f"Error: Cannot sell {amount} of {asset_symbol}, "
+                                       f"only {holdings[asset_symbol]:.8f} held")
+                            continue
+                        holdings[asset_symbol] -= amount
+                    elif transaction_type == 'buy':
+                        holdings[asset_symbol] += amount
+                    rows.append(row)
+                    results[i] = True
+
+                cursor.executemany(SQL_INSERT_TRANSACTION, rows)
+            return results
+        except Exception as e:
+            safe_print(f"Error adding transactions: {e}")
+            return [False] * len(transactions)
+
+    def _transaction_filter(self, asset_symbol: Optional[str],
+                            transaction_type: Optional[str]) -> Optional[Tuple[str, Tuple]]:
+        """Build the WHERE clause for a transaction listing, or None if a filter is invalid."""
+        conditions, params = [], ()
+        try:
+            if asset_symbol:
+                conditions.append("asset_symbol = ?")
+                params += (self._validate_symbol(asset_symbol),)
+            if transaction_type:
+                conditions.append("transaction_type = ?")
+                params += (self._validate_transaction_type(transaction_type),)
+        except ValueError:
+            return None
+        return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+    def get_transactions(self, asset_symbol: str = None, limit: Optional[int] = None,
+                         offset: int = 0, transaction_type: str = None) -> List[Dict]:
+        """Get all transactions, optionally for one asset and/or type, newest first.
+
+        Pass `limit` and/or `offset` to fetch a single page.
+        """
+        clause = self._transaction_filter(asset_symbol, transaction_type)
+        if clause is None:
+            return []
+        where, params = clause
+        query = f'''
+            SELECT * FROM transactions
+            {where}
+            ORDER BY transaction_date DESC, id DESC
+        '''
+
+        if limit is not None or offset:
+            # SQLite needs a LIMIT clause for OFFSET; -1 means no limit
+            query += " LIMIT ? OFFSET ?"
+            params += (-1 if limit is None else limit, offset)
+
+        return self._fetch_dicts(query, params)
+
+    def count_transactions(self, asset_symbol: str = None, transaction_type: str = None) -> int:
+        """Count the transactions get_transactions() lists for the same filters."""
+        clause = self._transaction_filter(asset_symbol, transaction_type)
+        if clause is None:
+            return 0
+        where, params = clause
+        with self._read_conn() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM transactions {where}", params).fetchone()[0]
 
     def delete_transaction(self, transaction_id: int) -> bool:
         """Delete a specific transaction by ID."""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,))
-            conn.commit()
-            conn.close()
+            with self._write_conn() as conn:
+                conn.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,))
             return True
         except Exception as e:
             safe_print(f"Error deleting transaction {transaction_id}: {e}")
@@ -464,33 +861,58 @@ class InvestmentTracker:
 
     def update_asset_prices(self) -> Dict[str, bool]:
         """Update all asset prices using yfinance and CoinGecko APIs."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT symbol, asset_type FROM assets")
-        assets = cursor.fetchall()
-        conn.close()
-
-        results = {}
-        crypto_count = 0
-
-        for symbol, asset_type in assets:
-            if asset_type == 'crypto':
-                crypto_count += 1
-                if crypto_count > 1:
-                    safe_print(f"Waiting to avoid rate limits... ({crypto_count} crypto assets)")
-                    time.sleep(2)
+        with self._read_conn() as conn:
+            assets = conn.execute("SELECT symbol, asset_type FROM assets").fetchall()
 
-            results[symbol] = self.update_single_asset_price(symbol, asset_type)
+        results = self._update_prices(assets)
 
         # Clean up old price history
         self._cleanup_price_history()
 
         return results
 
+    def _update_prices(self, assets: List[Tuple[str, str]]) -> Dict[str, bool]:
+        """Fetch and save prices for (symbol, asset_type) pairs; returns results in input order."""
+        results = {}
+        crypto_assets = [symbol for symbol, asset_type in assets if asset_type == 'crypto']
+
+        # Stock-like quotes are independent HTTP calls, so overlap their latency.
+        # Workers only fetch; prices are saved from this thread.
+        with ThreadPoolExecutor(max_workers=PRICE_FETCH_MAX_WORKERS) as executor:
+            futures = {executor.submit(self._fetch_stock_price, symbol): symbol
+                       for symbol, asset_type in assets if asset_type != 'crypto'}
+
+            # CoinGecko rate-limits aggressively, so all crypto is quoted in one request meanwhile
+            crypto_prices = self.fetch_crypto_prices_bulk(crypto_assets) if crypto_assets else {}
+            for symbol in crypto_assets:
+                price = crypto_prices.get(symbol)
+                results[symbol] = price is not None and price > 0
+                if results[symbol]:
+                    self._save_price(symbol, price)
+
+            for future in as_completed(futures):
+                symbol = futures[future]
+                results[symbol] = False
+                try:
+                    price = future.result()
+                    if price is not None and price > 0:
+                        self._save_price(symbol, price)
+                        results[symbol] = True
+                except Exception as e:
+                    safe_print(f"Error updating price for {symbol}: {e}")
+
+        return {symbol: results[symbol] for symbol, _ in assets}
+
     def update_single_asset_price(self, symbol: str, asset_type: str = None) -> bool:
-        """Update price for a single asset based on its type."""
+        """Update price for a single asset based on its type.
+
+        If `asset_type` is not given it is looked up, so crypto assets are
+        not mistakenly quoted as stocks.
+        """
         try:
             price = None
+            if asset_type is None:
+                asset_type = self.get_asset_type(symbol)
 
             if asset_type == 'crypto':
                 price = self._fetch_crypto_price(symbol)
@@ -506,32 +928,45 @@ class InvestmentTracker:
 
         return False
 
-    def _fetch_crypto_price(self, symbol: str) -> Optional[float]:
-        """Fetch cryptocurrency price from CoinGecko API in EUR."""
-        crypto_map = self.get_available_crypto_symbols()
-        if symbol not in crypto_map:
-            safe_print(f"No CoinGecko mapping for {symbol}")
-            return None
-
-        coin_id = crypto_map[symbol]
-        url = f"https://api.coingecko.com/api/v3/simple/price?ids={coin_id}&vs_currencies=eur"
-
-        # Rate-limit CoinGecko free tier
-        time.sleep(1.2)
+    def fetch_crypto_prices_bulk(self, symbols: List[str]) -> Dict[str, float]:
+        """Fetch EUR prices for several cryptocurrencies with one CoinGecko request.
 
-        response = self._fetch_with_backoff(url, max_retries=3, initial_delay=5.0)
-        if response is not None:
-            data = response.json()
-            if coin_id in data and 'eur' in data[coin_id]:
-                return data[coin_id]['eur']
+        Returns {symbol: price}; symbols without a mapping or a quote are left out.
+        """
+        crypto_map = self.get_available_crypto_symbols()
+        symbols_by_id: Dict[str, List[str]] = {}
+        for symbol in symbols:
+            if symbol in crypto_map:
+                symbols_by_id.setdefault(crypto_map[symbol], []).append(symbol)
             else:
-                safe_print(f"Unexpected CoinGecko response for {symbol}")
-        return None
+                safe_print(f"No CoinGecko mapping for {symbol}")
+        if not symbols_by_id:
+            return {}
+
+        url = ("https://api.coingecko.com/api/v3/simple/price"
+               f"?ids={','.join(symbols_by_id)}&vs_currencies=eur")
+        response = self._fetch_with_backoff(url, max_retries=3, initial_delay=5.0, limiter=COINGECKO_LIMITER)
+        if response is None:
+            return {}
+
+        data = response.json()
+        prices = {}
+        for coin_id, coin_symbols in symbols_by_id.items():
+            if 'eur' in data.get(coin_id, {}):
+                for symbol in coin_symbols:
+                    prices[symbol] = data[coin_id]['eur']
+            else:
+                safe_print(f"Unexpected CoinGecko response for {', '.join(coin_symbols)}")
+        return prices
+
+    def _fetch_crypto_price(self, symbol: str) -> Optional[float]:
+        """Fetch cryptocurrency price from CoinGecko API in EUR."""
+        return self.fetch_crypto_prices_bulk([symbol]).get(symbol)
 
     def _fetch_stock_price(self, symbol: str) -> Optional[float]:
         """Fetch stock/ETF/bond/commodity price via yfinance, converted to EUR."""
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = _ticker(symbol)
             currency = ticker.info.get('currency')
 
             # Try historical data first
@@ -559,28 +994,16 @@ class InvestmentTracker:
 
     def _save_price(self, symbol: str, price: float):
         """Save updated price to the database."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE assets SET current_price = ?, last_updated = CURRENT_TIMESTAMP
-            WHERE symbol = ?
-        ''', (price, symbol))
-        cursor.execute('''
-            INSERT INTO price_history (asset_symbol, price) VALUES (?, ?)
-        ''', (symbol, price))
-        conn.commit()
-        conn.close()
+        with self._write_conn() as conn:
+            conn.execute(SQL_UPDATE_PRICE, (price, symbol))
+            conn.execute(SQL_INSERT_PRICE_HISTORY, (symbol, price))
 
     def _cleanup_price_history(self):
         """Remove price history older than the retention period."""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
             cutoff = (datetime.datetime.now() - datetime.timedelta(days=PRICE_HISTORY_RETENTION_DAYS)).isoformat()
-            cursor.execute("DELETE FROM price_history WHERE date < ?", (cutoff,))
-            deleted = cursor.rowcount
-            conn.commit()
-            conn.close()
+            with self._write_conn() as conn:
+                deleted = conn.execute("DELETE FROM price_history WHERE date < ?", (cutoff,)).rowcount
             if deleted > 0:
                 safe_print(f"Cleaned up {deleted} old price history records")
         except Exception as e:
@@ -615,10 +1038,16 @@ class InvestmentTracker:
                 and (datetime.datetime.now() - self._cache_timestamp).total_seconds() < CRYPTO_CACHE_TTL_SECONDS):
             return self._crypto_symbols_cache
 
+        crypto_map = self._load_crypto_symbols_from_disk()
+        if crypto_map is not None:
+            InvestmentTracker._crypto_symbols_cache = crypto_map
+            InvestmentTracker._cache_timestamp = datetime.datetime.now()
+            return crypto_map
+
         try:
             safe_print("Fetching available cryptocurrency symbols from CoinGecko API...")
             url = "https://api.coingecko.com/api/v3/coins/list"
-            response = self._fetch_with_backoff(url, max_retries=2, initial_delay=3.0)
+            response = self._fetch_with_backoff(url, max_retries=2, initial_delay=3.0, limiter=COINGECKO_LIMITER)
             if response is not None:
                 coins = response.json()
 
@@ -631,8 +1060,9 @@ class InvestmentTracker:
                     if (len(sym) <= 10 and sym.isalnum() and sym not in crypto_map):
                         crypto_map[sym] = coin['id']
 
-                self._crypto_symbols_cache = crypto_map
-                self._cache_timestamp = datetime.datetime.now()
+                InvestmentTracker._crypto_symbols_cache = crypto_map
+                InvestmentTracker._cache_timestamp = datetime.datetime.now()
+                self._save_crypto_symbols_to_disk(crypto_map)
                 safe_print(f"Successfully fetched {len(crypto_map)} cryptocurrency symbols")
                 return crypto_map
         except Exception as e:
@@ -642,70 +1072,96 @@ class InvestmentTracker:
         safe_print("Using fallback cryptocurrency list")
         return PRIORITY_CRYPTO_MAPPING.copy()
 
+    def _load_crypto_symbols_from_disk(self) -> Optional[Dict[str, str]]:
+        """Read the persisted symbol map, or None if it is missing, stale or unreadable."""
+        path = self.crypto_cache_path
+        if not path:
+            return None
+        try:
+            if time.time() - os.path.getmtime(path) >= CRYPTO_DISK_CACHE_TTL_SECONDS:
+                return None
+            with open(path, encoding='utf-8') as f:
+                crypto_map = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return crypto_map if isinstance(crypto_map, dict) else None
+
+    def _save_crypto_symbols_to_disk(self, crypto_map: Dict[str, str]):
+        """Persist the symbol map atomically so concurrent readers never see a partial file."""
+        path = self.crypto_cache_path
+        if not path:
+            return
+        try:
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(crypto_map, f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            safe_print(f"Could not write crypto symbol cache: {e}")
+
     # ============== Portfolio ==============
 
     def get_portfolio_summary(self) -> List[Dict]:
         """Get a summary of the current portfolio with P&L calculations."""
-        conn = self._get_connection()
-
-        query = '''
+        # Aggregate holdings per asset, then derive value and P&L in the same query
+        # Money columns are rounded to cents here, so callers and tests see exact values
+        query = f'''
             SELECT
-                a.symbol, a.name, a.asset_type, a.platform, a.current_price,
-                COALESCE(SUM(CASE WHEN t.transaction_type = 'buy' THEN t.amount
-                                 WHEN t.transaction_type = 'sell' THEN -t.amount
-                                 ELSE 0 END), 0) as total_amount,
-                COALESCE(SUM(CASE WHEN t.transaction_type = 'buy' THEN t.total_value + t.fees
-                                 WHEN t.transaction_type = 'sell' THEN -(t.total_value - t.fees)
-                                 ELSE 0 END), 0) as total_invested
-            FROM assets a
-            LEFT JOIN transactions t ON a.symbol = t.asset_symbol
-            GROUP BY a.symbol, a.name, a.asset_type, a.platform, a.current_price
-            HAVING total_amount > 0
+                h.symbol, h.name, h.asset_type, h.platform, h.current_price, h.total_amount,
+                ROUND(h.total_invested, {MONEY_DECIMALS}) AS total_invested,
+                ROUND(h.total_amount * h.current_price, {MONEY_DECIMALS}) AS current_value,
+                ROUND(h.total_amount * h.current_price - h.total_invested, {MONEY_DECIMALS}) AS profit_loss,
+                CASE WHEN h.total_invested != 0
+                     THEN ROUND((h.total_amount * h.current_price - h.total_invested) / h.total_invested * 100, 2)
+                     ELSE 0.0 END AS profit_loss_percent
+            FROM (
+                SELECT
+                    a.symbol, a.name, a.asset_type, a.platform, a.current_price,
+                    COALESCE(SUM(CASE WHEN t.transaction_type = 'buy' THEN t.amount
+                                     WHEN t.transaction_type = 'sell' THEN -t.amount
+                                     ELSE 0 END), 0) as total_amount,
+                    COALESCE(SUM(CASE WHEN t.transaction_type = 'buy' THEN t.total_value + t.fees
+                                     WHEN t.transaction_type = 'sell' THEN -(t.total_value - t.fees)
+                                     ELSE 0 END), 0) as total_invested
+                FROM assets a
+                LEFT JOIN transactions t ON a.symbol = t.asset_symbol
+                GROUP BY a.symbol, a.name, a.asset_type, a.platform, a.current_price
+                HAVING total_amount > 0
+            ) h
         '''
 
-        df = pd.read_sql_query(query, conn)
-
-        if not df.empty:
-            df['current_value'] = df['total_amount'] * df['current_price']
-            df['profit_loss'] = df['current_value'] - df['total_invested']
-            # Guard against division by zero
-            df['profit_loss_percent'] = df.apply(
-                lambda row: round((row['profit_loss'] / row['total_invested']) * 100, 2)
-                if row['total_invested'] != 0 else 0.0,
-                axis=1
-            )
-
-        conn.close()
-        return df.to_dict('records') if not df.empty else []
+        return self._fetch_dicts(query)
 
     # ============== Price History ==============
 
     def get_price_history(self, asset_symbol: str = None) -> List[Dict]:
         """Get price history for all assets or a specific asset."""
-        conn = self._get_connection()
-
         if asset_symbol:
             try:
                 asset_symbol = self._validate_symbol(asset_symbol)
             except ValueError:
-                conn.close()
                 return []
             query = '''
                 SELECT * FROM price_history
                 WHERE asset_symbol = ?
                 ORDER BY date ASC
             '''
-            df = pd.read_sql_query(query, conn, params=(asset_symbol,))
+            params = (asset_symbol,)
         else:
             query = '''
                 SELECT ph.*, a.name as asset_name FROM price_history ph
                 JOIN assets a ON ph.asset_symbol = a.symbol
                 ORDER BY ph.date ASC
             '''
-            df = pd.read_sql_query(query, conn)
+            params = ()
 
-        conn.close()
-        return df.to_dict('records') if not df.empty else []
+        return self._fetch_dicts(query, params)
 
     # ============== Watchlist ==============
 
@@ -719,22 +1175,18 @@ class InvestmentTracker:
             return False
 
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
+            with self._write_conn() as conn:
+                cursor = conn.cursor()
 
-            cursor.execute("SELECT symbol FROM assets WHERE symbol = ?", (symbol,))
-            if not cursor.fetchone():
-                safe_print(f"Asset {symbol} does not exist. Please add the asset first.")
-                conn.close()
-                return False
-
-            cursor.execute('''
-                INSERT OR REPLACE INTO watchlist (asset_symbol, notes)
-                VALUES (?, ?)
-            ''', (symbol, notes))
+                cursor.execute(SQL_ASSET_EXISTS, (symbol,))
+                if not cursor.fetchone():
+                    safe_print(f"Asset {symbol} does not exist. Please add the asset first.")
+                    return False
 
-            conn.commit()
-            conn.close()
+                cursor.execute('''
+                    INSERT OR REPLACE INTO watchlist (asset_symbol, notes)
+                    VALUES (?, ?)
+                ''', (symbol, notes))
             return True
         except Exception as e:
             safe_print(f"Error adding {symbol} to watchlist: {e}")
@@ -749,11 +1201,8 @@ class InvestmentTracker:
             return False
 
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM watchlist WHERE asset_symbol = ?", (symbol,))
-            conn.commit()
-            conn.close()
+            with self._write_conn() as conn:
+                conn.execute("DELETE FROM watchlist WHERE asset_symbol = ?", (symbol,))
             return True
         except Exception as e:
             safe_print(f"Error removing {symbol} from watchlist: {e}")
@@ -761,8 +1210,6 @@ class InvestmentTracker:
 
     def get_watchlist(self) -> List[Dict]:
         """Get all assets in the watchlist with current prices."""
-        conn = self._get_connection()
-
         query = '''
             SELECT
                 a.symbol, a.name, a.asset_type, a.platform, a.current_price, a.last_updated,
@@ -771,10 +1218,7 @@ class InvestmentTracker:
             JOIN assets a ON w.asset_symbol = a.symbol
             ORDER BY w.added_date DESC
         '''
-        df = pd.read_sql_query(query, conn)
-
-        conn.close()
-        return df.to_dict('records') if not df.empty else []
+        return self._fetch_dicts(query)
 
     def is_in_watchlist(self, symbol: str) -> bool:
         """Check if an asset is in the watchlist."""
@@ -783,12 +1227,14 @@ class InvestmentTracker:
         except ValueError:
             return False
 
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT 1 FROM watchlist WHERE asset_symbol = ?", (symbol,))
-        result = cursor.fetchone() is not None
-        conn.close()
-        return result
+        with self._read_conn() as conn:
+            row = conn.execute("SELECT 1 FROM watchlist WHERE asset_symbol = ?", (symbol,)).fetchone()
+        return row is not None
+
+    def get_watchlist_symbols(self) -> set:
+        """Get the symbols of all watched assets in one query."""
+        with self._read_conn() as conn:
+            return {row[0] for row in conn.execute("SELECT asset_symbol FROM watchlist")}
 
     # ============== Search ==============
 
@@ -801,19 +1247,21 @@ class InvestmentTracker:
         # Search cryptocurrencies
         if asset_type is None or asset_type == 'crypto':
             crypto_map = self.get_available_crypto_symbols()
-            for symbol, coin_id in crypto_map.items():
-                if query_upper in symbol or query_lower in coin_id:
-                    results.append({
-                        'symbol': symbol,
-                        'name': coin_id.replace('-', ' ').title(),
-                        'asset_type': 'crypto',
-                        'source': 'coingecko'
-                    })
-
-        # For stocks/ETFs, try yfinance
-        if asset_type is None or asset_type in ('stock', 'etf'):
+            matches = ((symbol, coin_id) for symbol, coin_id in crypto_map.items()
+                       if query_upper in symbol or query_lower in coin_id)
+            # Stop scanning once the page is full instead of building every match
+            for symbol, coin_id in islice(matches, SEARCH_RESULT_LIMIT):
+                results.append({
+                    'symbol': symbol,
+                    'name': coin_id.replace('-', ' ').title(),
+                    'asset_type': 'crypto',
+                    'source': 'coingecko'
+                })
+
+        # For stocks/ETFs, try yfinance (skipped when crypto matches already fill the page)
+        if (asset_type is None or asset_type in ('stock', 'etf')) and len(results) < SEARCH_RESULT_LIMIT:
             try:
-                ticker = yf.Ticker(query_upper)
+                ticker = _ticker(query_upper)
                 info = ticker.info
                 if info and 'shortName' in info:
                     type_guess = 'etf' if 'ETF' in info.get('shortName', '').upper() else 'stock'
@@ -826,32 +1274,8 @@ class InvestmentTracker:
             except Exception:
                 pass
 
-        return results[:50]
+        return results
 
     def get_popular_assets(self) -> List[Dict]:
         """Get a list of popular assets for quick selection."""
-        return [
-            # Popular Stocks
-            {'symbol': 'AAPL', 'name': 'Apple Inc.', 'asset_type': 'stock'},
-            {'symbol': 'MSFT', 'name': 'Microsoft Corporation', 'asset_type': 'stock'},
-            {'symbol': 'GOOGL', 'name': 'Alphabet Inc.', 'asset_type': 'stock'},
-            {'symbol': 'AMZN', 'name': 'Amazon.com Inc.', 'asset_type': 'stock'},
-            {'symbol': 'TSLA', 'name': 'Tesla Inc.', 'asset_type': 'stock'},
-            {'symbol': 'NVDA', 'name': 'NVIDIA Corporation', 'asset_type': 'stock'},
-            {'symbol': 'META', 'name': 'Meta Platforms Inc.', 'asset_type': 'stock'},
-            # Popular ETFs
-            {'symbol': 'VWCE.DE', 'name': 'Vanguard FTSE All-World UCITS ETF', 'asset_type': 'etf'},
-            {'symbol': 'SPY', 'name': 'SPDR S&P 500 ETF Trust', 'asset_type': 'etf'},
-            {'symbol': 'QQQ', 'name': 'Invesco QQQ Trust', 'asset_type': 'etf'},
-            {'symbol': 'VTI', 'name': 'Vanguard Total Stock Market ETF', 'asset_type': 'etf'},
-            {'symbol': 'IWDA.AS', 'name': 'iShares Core MSCI World UCITS ETF', 'asset_type': 'etf'},
-            # Popular Cryptos
-            {'symbol': 'BTC', 'name': 'Bitcoin', 'asset_type': 'crypto'},
-            {'symbol': 'ETH', 'name': 'Ethereum', 'asset_type': 'crypto'},
-            {'symbol': 'SOL', 'name': 'Solana', 'asset_type': 'crypto'},
-            {'symbol': 'ADA', 'name': 'Cardano', 'asset_type': 'crypto'},
-            {'symbol': 'DOT', 'name': 'Polkadot', 'asset_type': 'crypto'},
-            {'symbol': 'AVAX', 'name': 'Avalanche', 'asset_type': 'crypto'},
-            {'symbol': 'MATIC', 'name': 'Polygon', 'asset_type': 'crypto'},
-            {'symbol': 'LINK', 'name': 'Chainlink', 'asset_type': 'crypto'},
-        ]
+        return [dict(asset) for asset in POPULAR_ASSETS]
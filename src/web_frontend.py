@@ -6,46 +6,118 @@ Flask-based web application with a clean, responsive HTML/CSS/JS interface
 import os
 import re
 import sys
-import glob
+import hashlib
 import logging
-import webbrowser
-from threading import Timer, Lock
-from flask import Flask, render_template, jsonify, request, g
-from flask_cors import CORS
-
-# Import our backend
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from src.backend import InvestmentTracker
+import functools
+import uuid
+from threading import Timer, Lock, RLock
+from flask import Flask, render_template, jsonify, request, make_response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to Flask's stdlib json provider
+    orjson = None
+
+# Import our backend (as the same top-level module the launcher and tests use)
+_SRC = os.path.dirname(os.path.abspath(__file__))
+if _SRC not in sys.path:
+    sys.path.insert(0, _SRC)
+from backend import InvestmentTracker, POPULAR_ASSETS
 
 logger = logging.getLogger(__name__)
 
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, which encodes straight to bytes.
+
+    Types orjson does not know natively go through Flask's default hook.
+    NaN values are emitted as null.
+    """
+
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=self.options).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.options),
+            mimetype=self.mimetype)
+
+
 app = Flask(__name__,
             template_folder=os.path.join(os.path.dirname(__file__), '..', 'templates'),
             static_folder=os.path.join(os.path.dirname(__file__), '..', 'static'))
-CORS(app)
+if orjson is not None:
+    app.json = ORJSONProvider(app)
+
+# The dashboard is served from this same origin, so CORS is opt-in: set
+# INVESTMENT_TRACKER_CORS_ORIGINS (comma-separated) to expose /api/* elsewhere
+CORS_ORIGINS = [o.strip() for o in os.environ.get('INVESTMENT_TRACKER_CORS_ORIGINS', '').split(',') if o.strip()]
+if CORS_ORIGINS:
+    from flask_cors import CORS  # only needed when cross-origin access is enabled
+    CORS(app, resources={r"/api/*": {"origins": CORS_ORIGINS}})
 
 # Project root directory for database discovery
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-# Thread-safe database name management
-_db_lock = Lock()
-_current_db_name = "my_assets.db"
+# The active database and its tracker live in app.config and are swapped as a pair
+_tracker_lock = RLock()
+app.config['DB_NAME'] = "my_assets.db"
+app.config['TRACKER'] = None
+
+# Bumped after every mutating request; GET responses are tagged with it for 304s
+_data_version = 0
+_data_version_lock = Lock()
+# The counter restarts with the process, so tags also carry a per-process nonce
+_instance_id = uuid.uuid4().hex
+
+# /api/crypto-symbols payload, rebuilt only when the tracker's symbol map changes
+_crypto_symbols_memo = (None, [])
+
+# Cache-Control values: ETag-tagged reads are revalidated on every use, writes are never stored
+REVALIDATE = 'private, no-cache'
+NO_STORE = 'no-store'
+
+# Upper bound (and default) for ?limit= on paginated listings
+MAX_PAGE_SIZE = 1000
+
+# Worker threads for the WSGI server; the dashboard fires several API calls at once
+SERVER_THREADS = 8
 
 # Regex for safe database names: alphanumeric, underscores, hyphens, dots only
 DB_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_\-]+\.db$')
 
+# Upper bound for rows in one POST /api/transactions/batch; each batch holds the writer
+MAX_BATCH_SIZE = 1000
+
 
 def _get_current_db_name() -> str:
     """Thread-safe getter for current database name."""
-    with _db_lock:
-        return _current_db_name
+    with _tracker_lock:
+        return app.config['DB_NAME']
+
 
+def _set_current_db_name(name: str, tracker: InvestmentTracker = None):
+    """Make `name` the active database.
 
-def _set_current_db_name(name: str):
-    """Thread-safe setter for current database name."""
-    global _current_db_name
-    with _db_lock:
-        _current_db_name = name
+    The new tracker is fully built before it is swapped in, so concurrent
+    requests see either the old database or the new one, never a half-open
+    state. The previous tracker is closed after the swap.
+    """
+    if tracker is None:
+        tracker = InvestmentTracker(os.path.join(PROJECT_ROOT, name))
+    with _tracker_lock:
+        old = app.config['TRACKER']
+        app.config['TRACKER'] = tracker
+        app.config['DB_NAME'] = name
+    if old is not None and old is not tracker:
+        old.close()
 
 
 def _validate_db_name(db_name: str) -> str:
@@ -79,6 +151,14 @@ def _validate_db_name(db_name: str) -> str:
     return db_name
 
 
+def _parse_non_negative_int(value: str) -> int:
+    """Parse a query-string integer that must be >= 0."""
+    number = int(value)
+    if number < 0:
+        raise ValueError("Value must be non-negative")
+    return number
+
+
 def _safe_error(e: Exception) -> str:
     """Return a safe error message without leaking internals."""
     msg = str(e)
@@ -91,21 +171,60 @@ def _safe_error(e: Exception) -> str:
     return msg
 
 
+def _bump_data_version():
+    """Invalidate every ETag handed out so far."""
+    global _data_version
+    with _data_version_lock:
+        _data_version += 1
+
+
+def conditional_get(view):
+    """Tag a GET route with an ETag and answer matching If-None-Match with 304.
+
+    The tag is derived from the write counter rather than the body, so an
+    unchanged resource is revalidated without touching the database. Tags
+    from a previous server run never match; writes made by other processes
+    while this one runs are not tracked.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        # Read the version before the data so a concurrent write can only make the tag stale
+        key = f"{_instance_id}|{_get_current_db_name()}|{_data_version}|{request.full_path}"
+        etag = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        if etag in request.if_none_match:
+            response = make_response('', 304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = REVALIDATE
+        return response
+    return wrapper
+
+
 def get_tracker() -> InvestmentTracker:
-    """Get or create a request-scoped InvestmentTracker instance."""
-    if 'tracker' not in g:
-        db_name = _get_current_db_name()
-        db_path = os.path.join(PROJECT_ROOT, db_name)
-        g.tracker = InvestmentTracker(db_path)
-    return g.tracker
+    """Return the app-wide InvestmentTracker, opening it on first use."""
+    with _tracker_lock:
+        if app.config['TRACKER'] is None:
+            db_path = os.path.join(PROJECT_ROOT, app.config['DB_NAME'])
+            app.config['TRACKER'] = InvestmentTracker(db_path)
+        return app.config['TRACKER']
+
+
+def close_tracker():
+    """Close the active tracker; the next request reopens it."""
+    with _tracker_lock:
+        tracker, app.config['TRACKER'] = app.config['TRACKER'], None
+    if tracker is not None:
+        tracker.close()
 
 
-# Disable caching for development
 @app.after_request
-def add_header(response):
-    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-    response.headers['Pragma'] = 'no-cache'
-    response.headers['Expires'] = '0'
+def track_writes(response):
+    if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+        _bump_data_version()
+        response.headers['Cache-Control'] = NO_STORE
     return response
 
 
@@ -120,6 +239,7 @@ def index():
 # ============== API Routes ==============
 
 @app.route('/api/portfolio', methods=['GET'])
+@conditional_get
 def get_portfolio():
     """Get portfolio summary"""
     try:
@@ -130,6 +250,7 @@ def get_portfolio():
 
 
 @app.route('/api/watchlist', methods=['GET'])
+@conditional_get
 def get_watchlist():
     """Get watchlist"""
     try:
@@ -170,13 +291,15 @@ def remove_from_watchlist(symbol):
 
 
 @app.route('/api/assets', methods=['GET'])
+@conditional_get
 def get_assets():
     """Get all assets"""
     try:
         tracker = get_tracker()
         assets = tracker.get_all_assets()
+        watched = tracker.get_watchlist_symbols()
         for asset in assets:
-            asset['in_watchlist'] = tracker.is_in_watchlist(asset['symbol'])
+            asset['in_watchlist'] = asset['symbol'] in watched
         return jsonify({'success': True, 'data': assets})
     except Exception as e:
         return jsonify({'success': False, 'error': _safe_error(e)}), 500
@@ -234,12 +357,27 @@ def update_asset_price(symbol):
 
 
 @app.route('/api/transactions', methods=['GET'])
+@conditional_get
 def get_transactions():
-    """Get all transactions"""
+    """Get one page of transactions (?limit=&offset=), optionally filtered by ?symbol= and ?type=
+
+    Pages hold at most MAX_PAGE_SIZE rows, which is also the default when
+    ?limit= is omitted; 'total' counts every matching transaction.
+    """
     try:
         symbol = request.args.get('symbol')
-        transactions = get_tracker().get_transactions(symbol)
-        return jsonify({'success': True, 'data': transactions})
+        tx_type = request.args.get('type')
+        limit = request.args.get('limit')
+        try:
+            limit = min(_parse_non_negative_int(limit), MAX_PAGE_SIZE) if limit is not None else MAX_PAGE_SIZE
+            offset = _parse_non_negative_int(request.args.get('offset', '0'))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'limit and offset must be non-negative integers'}), 400
+
+        tracker = get_tracker()
+        transactions = tracker.get_transactions(symbol, limit, offset, tx_type)
+        total = tracker.count_transactions(symbol, tx_type)
+        return jsonify({'success': True, 'data': transactions, 'total': total})
     except Exception as e:
         return jsonify({'success': False, 'error': _safe_error(e)}), 500
 
@@ -280,6 +418,52 @@ def add_transaction():
         return jsonify({'success': False, 'error': _safe_error(e)}), 500
 
 
+@app.route('/api/transactions/batch', methods=['POST'])
+def add_transactions_batch():
+    """Add many transactions in a single database transaction.
+
+    Responds with the number `added`, the `total` submitted and a `details`
+    list holding one success flag per submitted row, in order.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not data or not isinstance(data.get('transactions'), list):
+            return jsonify({'success': False, 'error': 'A list of transactions is required'}), 400
+        if not 1 <= len(data['transactions']) <= MAX_BATCH_SIZE:
+            return jsonify({'success': False,
+                            'error': f'Send between 1 and {MAX_BATCH_SIZE} transactions per batch'}), 400
+
+        batch = []
+        for i, tx in enumerate(data['transactions'], start=1):
+            if not isinstance(tx, dict) or not all(tx.get(k) for k in
+                                                   ('asset_symbol', 'transaction_type', 'amount', 'price_per_unit')):
+                return jsonify({'success': False, 'error': f'Required fields missing in transaction {i}'}), 400
+            try:
+                batch.append({
+                    'asset_symbol': tx['asset_symbol'],
+                    'transaction_type': tx['transaction_type'],
+                    'amount': float(tx['amount']),
+                    'price_per_unit': float(tx['price_per_unit']),
+                    'fees': float(tx['fees']) if tx.get('fees') else 0.0,
+                    'platform': tx.get('platform', ''),
+                    'transaction_date': tx.get('transaction_date'),
+                    'notes': tx.get('notes', ''),
+                })
+            except (TypeError, ValueError):
+                return jsonify({'success': False,
+                                'error': f'Amount, price, and fees must be numbers in transaction {i}'}), 400
+
+        results = get_tracker().add_transactions_bulk(batch)
+        return jsonify({
+            'success': all(results),
+            'added': sum(results),
+            'total': len(results),
+            'details': results
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': _safe_error(e)}), 500
+
+
 @app.route('/api/transactions/<int:transaction_id>', methods=['DELETE'])
 def delete_transaction(transaction_id):
     """Delete a transaction"""
@@ -311,13 +495,13 @@ def refresh_single_price(symbol):
     """Refresh price for a single asset"""
     try:
         tracker = get_tracker()
-        assets = tracker.get_all_assets()
-        asset = next((a for a in assets if a['symbol'] == symbol.upper()), None)
+        symbol = symbol.strip().upper()
+        asset_type = tracker.get_asset_type(symbol)
 
-        if not asset:
+        if asset_type is None:
             return jsonify({'success': False, 'error': 'Asset not found'}), 404
 
-        success = tracker.update_single_asset_price(symbol.upper(), asset['asset_type'])
+        success = tracker.update_single_asset_price(symbol, asset_type)
         return jsonify({'success': success})
     except Exception as e:
         return jsonify({'success': False, 'error': _safe_error(e)}), 500
@@ -331,8 +515,7 @@ def search_assets():
         asset_type = request.args.get('type')
 
         if len(query) < 1:
-            popular = get_tracker().get_popular_assets()
-            return jsonify({'success': True, 'data': popular})
+            return jsonify({'success': True, 'data': POPULAR_ASSETS})
 
         results = get_tracker().search_available_assets(query, asset_type)
         return jsonify({'success': True, 'data': results})
@@ -344,8 +527,7 @@ def search_assets():
 def get_popular_assets():
     """Get popular assets for quick selection"""
     try:
-        popular = get_tracker().get_popular_assets()
-        return jsonify({'success': True, 'data': popular})
+        return jsonify({'success': True, 'data': POPULAR_ASSETS})
     except Exception as e:
         return jsonify({'success': False, 'error': _safe_error(e)}), 500
 
@@ -353,16 +535,21 @@ def get_popular_assets():
 @app.route('/api/crypto-symbols', methods=['GET'])
 def get_crypto_symbols():
     """Get all available crypto symbols"""
+    global _crypto_symbols_memo
     try:
         crypto_map = get_tracker().get_available_crypto_symbols()
-        cryptos = [{'symbol': sym, 'name': name.replace('-', ' ').title(), 'asset_type': 'crypto'}
-                   for sym, name in crypto_map.items()]
+        source, cryptos = _crypto_symbols_memo
+        if source is not crypto_map:
+            cryptos = [{'symbol': sym, 'name': name.replace('-', ' ').title(), 'asset_type': 'crypto'}
+                       for sym, name in crypto_map.items()]
+            _crypto_symbols_memo = (crypto_map, cryptos)
         return jsonify({'success': True, 'data': cryptos})
     except Exception as e:
         return jsonify({'success': False, 'error': _safe_error(e)}), 500
 
 
 @app.route('/api/price-history', methods=['GET'])
+@conditional_get
 def get_price_history():
     """Get price history"""
     try:
@@ -382,26 +569,21 @@ def list_databases():
         db_files = []
         current = _get_current_db_name()
 
-        # Check project root
-        for db_path in glob.glob(os.path.join(PROJECT_ROOT, '*.db')):
-            db_name = os.path.basename(db_path)
-            db_files.append({
-                'name': db_name,
-                'path': db_name,
-                'size': os.path.getsize(db_path),
-                'is_current': db_name == current
-            })
-
-        # Check data folder
-        data_folder = os.path.join(PROJECT_ROOT, 'data')
-        if os.path.isdir(data_folder):
-            for db_path in glob.glob(os.path.join(data_folder, '*.db')):
-                db_name = os.path.basename(db_path)
-                relative_path = os.path.join('data', db_name)
+        # Check project root, then the data folder. scandir entries carry
+        # cached stat results, so there is no extra stat() per file.
+        for folder, prefix in ((PROJECT_ROOT, ''), (os.path.join(PROJECT_ROOT, 'data'), 'data')):
+            try:
+                entries = list(os.scandir(folder))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                if not entry.name.endswith('.db') or not entry.is_file():
+                    continue
+                relative_path = os.path.join(prefix, entry.name) if prefix else entry.name
                 db_files.append({
-                    'name': db_name,
+                    'name': entry.name,
                     'path': relative_path,
-                    'size': os.path.getsize(db_path),
+                    'size': entry.stat().st_size,
                     'is_current': relative_path == current
                 })
 
@@ -436,11 +618,11 @@ def load_database():
 
         # Validate it's actually a database by trying to open it
         try:
-            test_tracker = InvestmentTracker(db_path)
+            tracker = InvestmentTracker(db_path)
         except Exception:
             return jsonify({'success': False, 'error': 'Invalid database file'}), 400
 
-        _set_current_db_name(db_name)
+        _set_current_db_name(db_name, tracker)
 
         return jsonify({'success': True, 'message': f'Successfully loaded database: {db_name}'})
     except Exception as e:
@@ -477,8 +659,7 @@ def create_database():
             return jsonify({'success': False, 'error': 'Database already exists'}), 400
 
         # Create the new database
-        InvestmentTracker(db_path)
-        _set_current_db_name(db_name)
+        _set_current_db_name(db_name, InvestmentTracker(db_path))
 
         return jsonify({'success': True, 'message': f'Successfully created database: {db_name}'})
     except Exception as e:
@@ -487,24 +668,37 @@ def create_database():
 
 def open_browser():
     """Open the web browser after server starts"""
+    import webbrowser
     webbrowser.open('http://127.0.0.1:5000')
 
 
 def main():
     """Run the Flask application"""
-    print("=" * 50)
-    print("Investment Portfolio Tracker")
-    print("=" * 50)
-    print("Starting web server...")
-    print("Opening browser at http://127.0.0.1:5000")
-    print("Press Ctrl+C to stop the server")
-    print("=" * 50)
+    print("\n".join((
+        "=" * 50,
+        "Investment Portfolio Tracker",
+        "=" * 50,
+        "Starting web server...",
+        "Opening browser at http://127.0.0.1:5000",
+        "Press Ctrl+C to stop the server",
+        "=" * 50,
+    )))
 
     # Open browser after a short delay
     Timer(1.5, open_browser).start()
 
-    # Run Flask app
-    app.run(host='127.0.0.1', port=5000, debug=False)
+    # Serve with waitress when it is installed, else Werkzeug's threaded server
+    try:
+        from waitress import serve
+    except ImportError:
+        serve = None
+    try:
+        if serve is None:
+            app.run(host='127.0.0.1', port=5000, debug=False, threaded=True)
+        else:
+            serve(app, host='127.0.0.1', port=5000, threads=SERVER_THREADS)
+    finally:
+        close_tracker()
 
 
 if __name__ == '__main__':
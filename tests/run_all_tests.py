@@ -5,11 +5,18 @@ import unittest
 import sys
 import os
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+_SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if _SRC not in sys.path:
+    sys.path.insert(0, _SRC)
 
-if __name__ == '__main__':
+
+def run_all_tests(verbosity=2):
+    """Discover and run every test module in this folder; return True if all pass."""
     loader = unittest.TestLoader()
-    suite = loader.discover(os.path.dirname(__file__), pattern='test_*.py')
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(suite)
-    sys.exit(0 if result.wasSuccessful() else 1)
+    suite = loader.discover(os.path.dirname(os.path.abspath(__file__)), pattern='test_*.py')
+    runner = unittest.TextTestRunner(verbosity=verbosity)
+    return runner.run(suite).wasSuccessful()
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run_all_tests() else 1)
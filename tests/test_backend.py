@@ -9,18 +9,38 @@ import tempfile
 import os
 import sqlite3
 import datetime
+import time
+import threading
+from pathlib import Path
 from unittest.mock import patch, MagicMock
 import sys
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+_SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if _SRC not in sys.path:
+    sys.path.insert(0, _SRC)
 
 from backend import (
+    ConnectionPool,
+    RateLimiter,
     InvestmentTracker,
     VALID_ASSET_TYPES,
     VALID_TRANSACTION_TYPES,
     PRIORITY_CRYPTO_MAPPING,
+    CRYPTO_DISK_CACHE_TTL_SECONDS,
+    SEARCH_RESULT_LIMIT,
 )
 
+# Keep tests away from the user's on-disk CoinGecko cache
+_no_disk_cache = patch.object(InvestmentTracker, 'crypto_cache_path', None)
+
+
+def setUpModule():
+    _no_disk_cache.start()
+
+
+def tearDownModule():
+    _no_disk_cache.stop()
+
 
 def _make_tracker():
     """Create a tracker with a temp database and mocked price update."""
@@ -31,31 +51,77 @@ def _make_tracker():
     return tracker, tmp.name
 
 
+def _remove_db(db_path):
+    """Delete a test database together with its WAL sidecar files."""
+    for suffix in ('', '-wal', '-shm'):
+        Path(db_path + suffix).unlink(missing_ok=True)
+
+
+def _clear_tables(tracker):
+    """Empty every table so a shared tracker starts each test clean."""
+    with tracker._write_conn() as conn:
+        for table in ('watchlist', 'price_history', 'transactions', 'assets'):
+            conn.execute(f"DELETE FROM {table}")
+
+
+class TrackerTestCase(unittest.TestCase):
+    """Shares one in-memory tracker per class; each test starts with empty tables."""
+
+    @classmethod
+    def setUpClass(cls):
+        with patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True):
+            cls.tracker = InvestmentTracker(':memory:')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tracker.close()
+
+    def setUp(self):
+        _clear_tables(self.tracker)
+
+
 class TestDatabaseInitialization(unittest.TestCase):
     def setUp(self):
         self.tracker, self.db_path = _make_tracker()
 
     def tearDown(self):
-        os.unlink(self.db_path)
+        self.tracker.close()
+        _remove_db(self.db_path)
 
     def test_tables_created(self):
-        conn = sqlite3.connect(self.db_path)
-        cur = conn.cursor()
-        cur.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = {row[0] for row in cur.fetchall()}
-        conn.close()
-        for t in ('assets', 'transactions', 'price_history', 'watchlist'):
-            self.assertIn(t, tables)
+        with self.tracker._read_conn() as conn:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        self.assertEqual({'assets', 'transactions', 'price_history', 'watchlist'} - tables, set())
 
     def test_indexes_created(self):
-        conn = sqlite3.connect(self.db_path)
-        cur = conn.cursor()
-        cur.execute("SELECT name FROM sqlite_master WHERE type='index'")
-        indexes = {row[0] for row in cur.fetchall()}
-        conn.close()
-        for idx in ('idx_transactions_asset', 'idx_price_history_asset',
-                     'idx_price_history_date', 'idx_watchlist_asset'):
-            self.assertIn(idx, indexes)
+        with self.tracker._read_conn() as conn:
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        expected = {'idx_transactions_asset_date', 'idx_transactions_date',
+                    'idx_price_history_asset', 'idx_price_history_date',
+                    'idx_watchlist_asset'}
+        self.assertEqual(expected - indexes, set())
+        # Covered by the (asset_symbol, transaction_date) index
+        self.assertNotIn('idx_transactions_asset', indexes)
+
+    def test_filtered_transactions_use_composite_index(self):
+        statements = []
+        with self.tracker._read_conn() as conn:
+            conn.set_trace_callback(statements.append)
+        try:
+            # The pool hands the same idle reader straight back
+            self.tracker.get_transactions('AAPL', limit=10)
+        finally:
+            conn.set_trace_callback(None)
+        query = next(sql for sql in statements if 'FROM transactions' in sql)
+        with self.tracker._read_conn() as conn:
+            plan = ' '.join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + query))
+        self.assertIn('idx_transactions_asset_date', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_planner_statistics_gathered(self):
+        with self.tracker._read_conn() as conn:
+            row = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+        self.assertIsNotNone(row)
 
     def test_foreign_keys_enabled(self):
         conn = self.tracker._get_connection()
@@ -64,14 +130,139 @@ class TestDatabaseInitialization(unittest.TestCase):
         self.assertEqual(cur.fetchone()[0], 1)
         conn.close()
 
+    def test_connection_pragmas(self):
+        conn = self.tracker._get_connection()
+        cur = conn.cursor()
+        cur.execute("PRAGMA journal_mode")
+        self.assertEqual(cur.fetchone()[0], 'wal')
+        cur.execute("PRAGMA synchronous")
+        self.assertEqual(cur.fetchone()[0], 1)  # NORMAL
+        cur.execute("PRAGMA busy_timeout")
+        self.assertEqual(cur.fetchone()[0], 5000)
+        cur.execute("PRAGMA mmap_size")
+        self.assertEqual(cur.fetchone()[0], 268435456)
+        conn.close()
+
 
-class TestInputValidation(unittest.TestCase):
+class TestConnectionPool(unittest.TestCase):
     def setUp(self):
         self.tracker, self.db_path = _make_tracker()
 
     def tearDown(self):
-        os.unlink(self.db_path)
+        self.tracker.close()
+        _remove_db(self.db_path)
+
+    def test_pool_reuses_connections(self):
+        pool = ConnectionPool(lambda: sqlite3.connect(':memory:'), 2)
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            self.assertIs(first, second)
+        pool.close()
+
+    def test_pool_blocks_at_capacity(self):
+        pool = ConnectionPool(lambda: sqlite3.connect(':memory:', check_same_thread=False), 1)
+        acquired = []
+        with pool.connection() as conn:
+            worker = threading.Thread(target=lambda: acquired.append(pool._acquire()))
+            worker.start()
+            worker.join(0.1)
+            self.assertEqual(acquired, [])
+        worker.join(1)
+        self.assertEqual(acquired, [conn])
+        pool.close()
+
+    def test_close_releases_blocked_waiter(self):
+        pool = ConnectionPool(lambda: sqlite3.connect(':memory:', check_same_thread=False), 1)
+        acquired = []
+        with pool.connection() as conn:
+            worker = threading.Thread(target=lambda: acquired.append(pool._acquire()))
+            worker.start()
+            worker.join(0.1)
+            self.assertEqual(acquired, [])
+            pool.close()
+            worker.join(2)
+            self.assertFalse(worker.is_alive())
+        self.assertEqual(len(acquired), 1)
+        self.assertIsNot(acquired[0], conn)
+        acquired[0].close()
+
+    def test_readers_are_read_only(self):
+        with self.tracker._read_conn() as conn:
+            with self.assertRaises(sqlite3.OperationalError):
+                conn.execute("DELETE FROM assets")
+
+    def test_nested_writes_share_transaction(self):
+        with patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True):
+            with self.assertRaises(RuntimeError):
+                with self.tracker._write_conn():
+                    self.tracker.add_asset('AAPL', 'Apple Inc.', 'stock')
+                    self.assertIsNotNone(self.tracker.get_asset_type('AAPL'))
+                    raise RuntimeError("abort")
+        self.assertIsNone(self.tracker.get_asset_type('AAPL'))
+
+    @patch.object(InvestmentTracker, '_update_prices', return_value={})
+    def test_batch_commits_together(self, mock_prices):
+        with self.tracker.batch():
+            self.tracker.add_asset('AAPL', 'Apple Inc.', 'stock')
+            self.tracker.add_transaction('AAPL', 'buy', 10, 150.0)
+        self.assertIsNotNone(self.tracker.get_asset_type('AAPL'))
+        self.assertEqual(len(self.tracker.get_transactions('AAPL')), 1)
+
+        with self.assertRaises(RuntimeError):
+            with self.tracker.batch():
+                self.tracker.add_asset('BTC', 'Bitcoin', 'crypto')
+                self.tracker.add_transaction('AAPL', 'buy', 5, 160.0)
+                raise RuntimeError("abort")
+        self.assertIsNone(self.tracker.get_asset_type('BTC'))
+        self.assertEqual(len(self.tracker.get_transactions('AAPL')), 1)
+
+    def test_batch_fetches_prices_after_commit(self):
+        fetched = []
+
+        def fake_prices(assets):
+            # The writer must already be released when the network calls run
+            self.assertIsNone(self.tracker._local.write_conn)
+            fetched.extend(assets)
+            return {}
+
+        with patch.object(self.tracker, '_update_prices', side_effect=fake_prices):
+            with self.tracker.batch():
+                self.tracker.add_asset('AAPL', 'Apple Inc.', 'stock')
+                self.tracker.add_assets_bulk([{'symbol': 'BTC', 'name': 'Bitcoin', 'asset_type': 'crypto'}])
+                self.assertEqual(fetched, [])
+            self.assertEqual(fetched, [('AAPL', 'stock'), ('BTC', 'crypto')])
+
+            with self.assertRaises(RuntimeError):
+                with self.tracker.batch():
+                    self.tracker.add_asset('ETH', 'Ethereum', 'crypto')
+                    raise RuntimeError("abort")
+        self.assertEqual(len(fetched), 2)
+
+    @patch.object(InvestmentTracker, '_update_prices', return_value={})
+    @patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True)
+    def test_failed_call_inside_batch_leaves_no_partial_writes(self, mock_price, mock_prices):
+        self.tracker.add_asset('AAPL', 'Apple Inc.', 'stock')
+        self.tracker.add_transaction('AAPL', 'buy', 10, 150.0)
+        with self.tracker._write_conn() as conn:
+            # Fail the last of delete_asset's four deletes
+            conn.execute("CREATE TRIGGER keep_assets BEFORE DELETE ON assets "
+                         "BEGIN SELECT RAISE(ABORT, 'locked'); END")
+        with self.tracker.batch():
+            self.assertFalse(self.tracker.delete_asset('AAPL'))
+            self.tracker.add_asset('MSFT', 'Microsoft', 'stock')
+        self.assertEqual(len(self.tracker.get_transactions('AAPL')), 1)
+        self.assertEqual(self.tracker.get_asset_type('MSFT'), 'stock')
+
+    def test_memory_database(self):
+        tracker = InvestmentTracker(':memory:')
+        with patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True):
+            self.assertTrue(tracker.add_asset('AAPL', 'Apple Inc.', 'stock'))
+        self.assertEqual(len(tracker.get_all_assets()), 1)
+        tracker.close()
+
 
+class TestInputValidation(TrackerTestCase):
     def test_validate_symbol_valid(self):
         self.assertEqual(self.tracker._validate_symbol('aapl'), 'AAPL')
         self.assertEqual(self.tracker._validate_symbol('VWCE.DE'), 'VWCE.DE')
@@ -127,13 +318,7 @@ class TestInputValidation(unittest.TestCase):
             self.tracker._validate_notes('N' * 501)
 
 
-class TestAssetOperations(unittest.TestCase):
-    def setUp(self):
-        self.tracker, self.db_path = _make_tracker()
-
-    def tearDown(self):
-        os.unlink(self.db_path)
-
+class TestAssetOperations(TrackerTestCase):
     @patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True)
     def test_add_asset(self, mock_price):
         self.assertTrue(self.tracker.add_asset('AAPL', 'Apple Inc.', 'stock', 'IB'))
@@ -162,21 +347,44 @@ class TestAssetOperations(unittest.TestCase):
         self.assertEqual(len(self.tracker.get_transactions()), 0)
         self.assertEqual(len(self.tracker.get_watchlist()), 0)
 
+    @patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True)
+    def test_get_asset_type(self, mock_price):
+        self.tracker.add_asset('BTC', 'Bitcoin', 'crypto')
+        self.assertEqual(self.tracker.get_asset_type('btc'), 'crypto')
+        self.assertIsNone(self.tracker.get_asset_type('NOPE'))
+        self.assertIsNone(self.tracker.get_asset_type('../etc'))
+
+    @patch.object(InvestmentTracker, '_update_prices', return_value={})
+    def test_add_assets_bulk(self, mock_prices):
+        results = self.tracker.add_assets_bulk([
+            {'symbol': 'aapl', 'name': 'Apple Inc.', 'asset_type': 'stock', 'platform': 'IB'},
+            {'symbol': 'BTC', 'name': 'Bitcoin', 'asset_type': 'crypto'},
+            {'symbol': 'BAD!', 'name': 'Invalid', 'asset_type': 'stock'},
+            {'symbol': 'X', 'asset_type': 'stock'},
+        ])
+        self.assertEqual(results, [True, True, False, False])
+        self.assertEqual([a['symbol'] for a in self.tracker.get_all_assets()], ['AAPL', 'BTC'])
+        mock_prices.assert_called_once_with([('AAPL', 'stock'), ('BTC', 'crypto')])
+
+    @patch.object(InvestmentTracker, '_update_prices')
+    def test_add_assets_bulk_without_prices(self, mock_prices):
+        self.assertEqual(self.tracker.add_assets_bulk(
+            [{'symbol': 'AAPL', 'name': 'Apple Inc.', 'asset_type': 'stock'}], update_prices=False), [True])
+        mock_prices.assert_not_called()
+
     @patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True)
     def test_get_all_assets_empty(self, mock_price):
         self.assertEqual(self.tracker.get_all_assets(), [])
 
 
-class TestTransactionOperations(unittest.TestCase):
+class TestTransactionOperations(TrackerTestCase):
     def setUp(self):
-        self.tracker, self.db_path = _make_tracker()
-        with patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True):
+        super().setUp()
+        with patch.object(InvestmentTracker, '_update_prices', return_value={}), \
+                self.tracker.batch():
             self.tracker.add_asset('AAPL', 'Apple Inc.', 'stock')
             self.tracker.add_asset('BTC', 'Bitcoin', 'crypto')
 
-    def tearDown(self):
-        os.unlink(self.db_path)
-
     def test_add_buy_transaction(self):
         self.assertTrue(self.tracker.add_transaction('AAPL', 'buy', 10, 150.0, 5.0, 'IB'))
         txns = self.tracker.get_transactions()
@@ -227,12 +435,60 @@ class TestTransactionOperations(unittest.TestCase):
         self.assertEqual(len(apple_txns), 1)
         self.assertEqual(apple_txns[0]['asset_symbol'], 'AAPL')
 
+    def test_get_transactions_paginated(self):
+        for day in range(1, 6):
+            self.tracker.add_transaction('AAPL', 'buy', day, 150.0, transaction_date=f'2024-01-0{day}')
+        page = self.tracker.get_transactions(limit=2)
+        self.assertEqual([t['amount'] for t in page], [5.0, 4.0])
+        page = self.tracker.get_transactions('AAPL', limit=2, offset=4)
+        self.assertEqual([t['amount'] for t in page], [1.0])
+        self.assertEqual(len(self.tracker.get_transactions()), 5)
+        page = self.tracker.get_transactions(offset=3)
+        self.assertEqual([t['amount'] for t in page], [2.0, 1.0])
+
+    def test_filter_and_count_transactions(self):
+        self.tracker.add_transaction('AAPL', 'buy', 10, 150.0)
+        self.tracker.add_transaction('AAPL', 'sell', 4, 160.0)
+        self.tracker.add_transaction('BTC', 'buy', 0.5, 40000.0)
+        sells = self.tracker.get_transactions('AAPL', transaction_type='sell')
+        self.assertEqual([t['amount'] for t in sells], [4.0])
+        self.assertEqual(self.tracker.count_transactions(), 3)
+        self.assertEqual(self.tracker.count_transactions(transaction_type='buy'), 2)
+        self.assertEqual(self.tracker.count_transactions('btc'), 1)
+        self.assertEqual(self.tracker.get_transactions(transaction_type='bogus'), [])
+        self.assertEqual(self.tracker.count_transactions(transaction_type='bogus'), 0)
+
     def test_delete_transaction(self):
         self.tracker.add_transaction('AAPL', 'buy', 10, 150.0)
         txns = self.tracker.get_transactions()
         self.assertTrue(self.tracker.delete_transaction(txns[0]['id']))
         self.assertEqual(len(self.tracker.get_transactions()), 0)
 
+    def test_add_transactions_bulk(self):
+        results = self.tracker.add_transactions_bulk([
+            {'asset_symbol': 'AAPL', 'transaction_type': 'buy', 'amount': 10, 'price_per_unit': 150.0},
+            {'asset_symbol': 'aapl', 'transaction_type': 'sell', 'amount': 4, 'price_per_unit': 160.0},
+            {'asset_symbol': 'BTC', 'transaction_type': 'buy', 'amount': 0.5, 'price_per_unit': 50000.0,
+             'fees': 10.0, 'notes': 'Bulk'},
+        ])
+        self.assertEqual(results, [True, True, True])
+        self.assertEqual(len(self.tracker.get_transactions()), 3)
+        self.assertEqual(self.tracker.get_transactions('BTC')[0]['notes'], 'Bulk')
+
+    def test_add_transactions_bulk_skips_invalid_rows(self):
+        results = self.tracker.add_transactions_bulk([
+            {'asset_symbol': 'AAPL', 'transaction_type': 'buy', 'amount': 5, 'price_per_unit': 150.0},
+            {'asset_symbol': 'AAPL', 'transaction_type': 'sell', 'amount': 6, 'price_per_unit': 160.0},
+            {'asset_symbol': 'NOPE', 'transaction_type': 'buy', 'amount': 1, 'price_per_unit': 1.0},
+            {'asset_symbol': 'AAPL', 'transaction_type': 'buy', 'amount': -1, 'price_per_unit': 1.0},
+            {'asset_symbol': 'AAPL', 'transaction_type': 'buy', 'amount': 1, 'price_per_unit': 1.0, 'bogus': 1},
+        ])
+        self.assertEqual(results, [True, False, False, False, False])
+        self.assertEqual(len(self.tracker.get_transactions()), 1)
+
+    def test_add_transactions_bulk_empty(self):
+        self.assertEqual(self.tracker.add_transactions_bulk([]), [])
+
     def test_dividend_and_fee_transactions(self):
         self.assertTrue(self.tracker.add_transaction('AAPL', 'dividend', 50, 1.0))
         self.assertTrue(self.tracker.add_transaction('AAPL', 'fee', 1, 10.0))
@@ -240,16 +496,14 @@ class TestTransactionOperations(unittest.TestCase):
         self.assertEqual(len(txns), 2)
 
 
-class TestPortfolioSummary(unittest.TestCase):
+class TestPortfolioSummary(TrackerTestCase):
     def setUp(self):
-        self.tracker, self.db_path = _make_tracker()
-        with patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True):
+        super().setUp()
+        with patch.object(InvestmentTracker, '_update_prices', return_value={}), \
+                self.tracker.batch():
             self.tracker.add_asset('AAPL', 'Apple Inc.', 'stock')
             self.tracker.add_asset('BTC', 'Bitcoin', 'crypto')
 
-    def tearDown(self):
-        os.unlink(self.db_path)
-
     def test_empty_portfolio(self):
         self.assertEqual(self.tracker.get_portfolio_summary(), [])
 
@@ -261,9 +515,17 @@ class TestPortfolioSummary(unittest.TestCase):
         a = portfolio[0]
         self.assertEqual(a['symbol'], 'AAPL')
         self.assertEqual(a['total_amount'], 10.0)
-        self.assertAlmostEqual(a['total_invested'], 1505.0)
-        self.assertAlmostEqual(a['current_value'], 1600.0)
-        self.assertAlmostEqual(a['profit_loss'], 95.0)
+        self.assertEqual(a['total_invested'], 1505.0)
+        self.assertEqual(a['current_value'], 1600.0)
+        self.assertEqual(a['profit_loss'], 95.0)
+        self.assertEqual(a['profit_loss_percent'], 6.31)
+
+    def test_portfolio_loss_percent(self):
+        self.tracker.add_transaction('BTC', 'buy', 2, 50000.0)
+        self.tracker._save_price('BTC', 40000.0)
+        a = self.tracker.get_portfolio_summary()[0]
+        self.assertEqual(a['profit_loss'], -20000.0)
+        self.assertEqual(a['profit_loss_percent'], -20.0)
 
     def test_portfolio_buy_and_sell(self):
         self.tracker.add_transaction('AAPL', 'buy', 10, 150.0, 5.0)
@@ -271,7 +533,7 @@ class TestPortfolioSummary(unittest.TestCase):
         self.tracker._save_price('AAPL', 170.0)
         portfolio = self.tracker.get_portfolio_summary()
         self.assertEqual(portfolio[0]['total_amount'], 6.0)
-        self.assertAlmostEqual(portfolio[0]['total_invested'], 868.0)
+        self.assertEqual(portfolio[0]['total_invested'], 868.0)
 
     def test_portfolio_excludes_zero_holdings(self):
         self.tracker.add_transaction('AAPL', 'buy', 10, 150.0)
@@ -286,16 +548,31 @@ class TestPortfolioSummary(unittest.TestCase):
         portfolio = self.tracker.get_portfolio_summary()
         self.assertEqual(len(portfolio), 2)
 
+    def test_money_rounded_to_cents(self):
+        # 0.1 + 0.2 style float noise must not leak into the totals
+        self.tracker.add_transaction('BTC', 'buy', 0.1, 0.1)
+        self.tracker.add_transaction('BTC', 'buy', 0.2, 0.1)
+        self.tracker.add_transaction('BTC', 'buy', 3, 33.333)
+        self.tracker._save_price('BTC', 33.333)
+        a = self.tracker.get_portfolio_summary()[0]
+        self.assertEqual(a['total_invested'], 100.03)
+        self.assertEqual(a['current_value'], 110.0)
+        self.assertEqual(a['profit_loss'], 9.97)
 
-class TestWatchlist(unittest.TestCase):
+
+class TestWatchlist(TrackerTestCase):
     def setUp(self):
-        self.tracker, self.db_path = _make_tracker()
-        with patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True):
+        super().setUp()
+        with patch.object(InvestmentTracker, '_update_prices', return_value={}), \
+                self.tracker.batch():
             self.tracker.add_asset('AAPL', 'Apple Inc.', 'stock')
             self.tracker.add_asset('BTC', 'Bitcoin', 'crypto')
 
-    def tearDown(self):
-        os.unlink(self.db_path)
+    def test_get_watchlist_symbols(self):
+        self.assertEqual(self.tracker.get_watchlist_symbols(), set())
+        self.tracker.add_to_watchlist('AAPL')
+        self.tracker.add_to_watchlist('BTC')
+        self.assertEqual(self.tracker.get_watchlist_symbols(), {'AAPL', 'BTC'})
 
     def test_add_to_watchlist(self):
         self.assertTrue(self.tracker.add_to_watchlist('AAPL'))
@@ -320,20 +597,26 @@ class TestWatchlist(unittest.TestCase):
         self.assertEqual(self.tracker.get_watchlist(), [])
 
 
-class TestPriceOperations(unittest.TestCase):
+class TestPriceOperations(TrackerTestCase):
     def setUp(self):
-        self.tracker, self.db_path = _make_tracker()
+        super().setUp()
         with patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True):
             self.tracker.add_asset('AAPL', 'Apple Inc.', 'stock')
 
-    def tearDown(self):
-        os.unlink(self.db_path)
-
     def test_save_price(self):
         self.tracker._save_price('AAPL', 155.50)
         assets = self.tracker.get_all_assets()
         self.assertAlmostEqual(assets[0]['current_price'], 155.50)
 
+    @patch.object(InvestmentTracker, '_fetch_stock_price')
+    @patch.object(InvestmentTracker, '_fetch_crypto_price', return_value=40000.0)
+    def test_single_price_update_looks_up_type(self, mock_crypto, mock_stock):
+        with patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True):
+            self.tracker.add_asset('BTC', 'Bitcoin', 'crypto')
+        self.assertTrue(self.tracker.update_single_asset_price('BTC'))
+        mock_crypto.assert_called_once_with('BTC')
+        mock_stock.assert_not_called()
+
     def test_manual_price_update_valid(self):
         self.assertTrue(self.tracker.update_asset_values_manually('AAPL', 200.0))
         assets = self.tracker.get_all_assets()
@@ -350,15 +633,12 @@ class TestPriceOperations(unittest.TestCase):
         self.assertEqual(len(history), 2)
 
     def test_cleanup_old_price_history(self):
-        conn = self.tracker._get_connection()
-        cur = conn.cursor()
         old_date = (datetime.datetime.now() - datetime.timedelta(days=400)).isoformat()
-        cur.execute("INSERT INTO price_history (asset_symbol, price, date) VALUES (?, ?, ?)",
-                    ('AAPL', 100.0, old_date))
-        cur.execute("INSERT INTO price_history (asset_symbol, price, date) VALUES (?, ?, ?)",
-                    ('AAPL', 150.0, datetime.datetime.now().isoformat()))
-        conn.commit()
-        conn.close()
+        with self.tracker._write_conn() as conn:
+            conn.execute("INSERT INTO price_history (asset_symbol, price, date) VALUES (?, ?, ?)",
+                         ('AAPL', 100.0, old_date))
+            conn.execute("INSERT INTO price_history (asset_symbol, price, date) VALUES (?, ?, ?)",
+                         ('AAPL', 150.0, datetime.datetime.now().isoformat()))
         self.tracker._cleanup_price_history()
         history = self.tracker.get_price_history('AAPL')
         self.assertEqual(len(history), 1)
@@ -370,6 +650,39 @@ class TestPriceOperations(unittest.TestCase):
         self.assertTrue(result)
         mock_fetch.assert_called_once_with('AAPL')
 
+    @patch.object(InvestmentTracker, 'fetch_crypto_prices_bulk', return_value={'BTC': 50000.0})
+    @patch.object(InvestmentTracker, '_fetch_stock_price', side_effect=lambda s: {'AAPL': 175.0}.get(s))
+    def test_update_asset_prices(self, mock_stock, mock_crypto):
+        with patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True):
+            self.tracker.add_asset('MSFT', 'Microsoft', 'stock')
+            self.tracker.add_asset('BTC', 'Bitcoin', 'crypto')
+            self.tracker.add_asset('ETH', 'Ethereum', 'crypto')
+        results = self.tracker.update_asset_prices()
+        self.assertEqual(results, {'AAPL': True, 'BTC': True, 'ETH': False, 'MSFT': False})
+        mock_crypto.assert_called_once_with(['BTC', 'ETH'])
+        prices = {a['symbol']: a['current_price'] for a in self.tracker.get_all_assets()}
+        self.assertAlmostEqual(prices['AAPL'], 175.0)
+        self.assertAlmostEqual(prices['BTC'], 50000.0)
+        self.assertAlmostEqual(prices['MSFT'], 0.0)
+
+    @patch.object(InvestmentTracker, 'get_available_crypto_symbols',
+                  return_value={'BTC': 'bitcoin', 'ETH': 'ethereum'})
+    def test_fetch_crypto_prices_single_request(self, mock_map):
+        response = MagicMock()
+        response.json.return_value = {'bitcoin': {'eur': 50000.0}, 'ethereum': {}}
+        with patch.object(InvestmentTracker, '_fetch_with_backoff', return_value=response) as mock_get:
+            prices = self.tracker.fetch_crypto_prices_bulk(['BTC', 'ETH', 'NOPE'])
+        self.assertEqual(prices, {'BTC': 50000.0})
+        mock_get.assert_called_once()
+        self.assertIn('ids=bitcoin,ethereum&', mock_get.call_args[0][0])
+
+    @patch('backend.time.sleep')
+    @patch.object(InvestmentTracker, 'fetch_crypto_prices_bulk', return_value={'BTC': 50000.0})
+    def test_fetch_crypto_price_uses_bulk_without_sleep(self, mock_bulk, mock_sleep):
+        self.assertEqual(self.tracker._fetch_crypto_price('BTC'), 50000.0)
+        mock_bulk.assert_called_once_with(['BTC'])
+        mock_sleep.assert_not_called()
+
     @patch.object(InvestmentTracker, '_fetch_crypto_price', return_value=50000.0)
     def test_update_single_asset_crypto(self, mock_fetch):
         with patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True):
@@ -379,13 +692,7 @@ class TestPriceOperations(unittest.TestCase):
         mock_fetch.assert_called_once_with('BTC')
 
 
-class TestCurrencyConversion(unittest.TestCase):
-    def setUp(self):
-        self.tracker, self.db_path = _make_tracker()
-
-    def tearDown(self):
-        os.unlink(self.db_path)
-
+class TestCurrencyConversion(TrackerTestCase):
     def test_eur_passthrough(self):
         self.assertAlmostEqual(self.tracker._convert_to_eur(100.0, 'EUR'), 100.0)
         self.assertAlmostEqual(self.tracker._convert_to_eur(100.0, None), 100.0)
@@ -399,12 +706,10 @@ class TestCurrencyConversion(unittest.TestCase):
         self.assertAlmostEqual(self.tracker._convert_to_eur(100.0, 'USD'), 92.0)
 
 
-class TestCryptoSymbols(unittest.TestCase):
-    def setUp(self):
-        self.tracker, self.db_path = _make_tracker()
-
+class TestCryptoSymbols(TrackerTestCase):
     def tearDown(self):
-        os.unlink(self.db_path)
+        InvestmentTracker._crypto_symbols_cache = None
+        InvestmentTracker._cache_timestamp = None
 
     @patch.object(InvestmentTracker, '_fetch_with_backoff')
     def test_fetches_from_api(self, mock_fetch):
@@ -414,33 +719,59 @@ class TestCryptoSymbols(unittest.TestCase):
             {'symbol': 'xyz', 'id': 'some-coin'},
         ]
         mock_fetch.return_value = mock_response
-        self.tracker._crypto_symbols_cache = None
+        InvestmentTracker._crypto_symbols_cache = None
         result = self.tracker.get_available_crypto_symbols()
         self.assertIn('BTC', result)
         self.assertEqual(result['BTC'], 'bitcoin')  # priority mapping
         self.assertIn('XYZ', result)
 
     def test_uses_cache(self):
-        self.tracker._crypto_symbols_cache = {'BTC': 'bitcoin'}
-        self.tracker._cache_timestamp = datetime.datetime.now()
+        InvestmentTracker._crypto_symbols_cache = {'BTC': 'bitcoin'}
+        InvestmentTracker._cache_timestamp = datetime.datetime.now()
         result = self.tracker.get_available_crypto_symbols()
         self.assertEqual(result, {'BTC': 'bitcoin'})
 
+    @patch.object(InvestmentTracker, '_fetch_with_backoff')
+    def test_cache_shared_between_trackers(self, mock_fetch):
+        mock_fetch.return_value = MagicMock(json=MagicMock(return_value=[{'symbol': 'xyz', 'id': 'some-coin'}]))
+        self.tracker.get_available_crypto_symbols()
+        other, other_path = _make_tracker()
+        self.assertIn('XYZ', other.get_available_crypto_symbols())
+        self.assertEqual(mock_fetch.call_count, 1)
+        other.close()
+        _remove_db(other_path)
+
+    @patch.object(InvestmentTracker, '_fetch_with_backoff')
+    def test_disk_cache_round_trip(self, mock_fetch):
+        mock_fetch.return_value = MagicMock(json=MagicMock(return_value=[{'symbol': 'xyz', 'id': 'some-coin'}]))
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_file = os.path.join(cache_dir, 'nested', 'coins_list.json')
+            with patch.object(InvestmentTracker, 'crypto_cache_path', cache_file):
+                self.tracker.get_available_crypto_symbols()
+                self.assertTrue(os.path.exists(cache_file))
+                self.assertEqual(os.listdir(os.path.dirname(cache_file)), ['coins_list.json'])
+
+                # A fresh process starts with an empty memory cache
+                InvestmentTracker._crypto_symbols_cache = None
+                self.assertEqual(self.tracker.get_available_crypto_symbols()['XYZ'], 'some-coin')
+                self.assertEqual(mock_fetch.call_count, 1)
+
+                # Past the TTL the file is ignored and the API is asked again
+                stale = time.time() - CRYPTO_DISK_CACHE_TTL_SECONDS - 1
+                os.utime(cache_file, (stale, stale))
+                InvestmentTracker._crypto_symbols_cache = None
+                self.tracker.get_available_crypto_symbols()
+                self.assertEqual(mock_fetch.call_count, 2)
+
     @patch.object(InvestmentTracker, '_fetch_with_backoff', return_value=None)
     def test_fallback_on_api_failure(self, mock_fetch):
-        self.tracker._crypto_symbols_cache = None
+        InvestmentTracker._crypto_symbols_cache = None
         result = self.tracker.get_available_crypto_symbols()
         self.assertIn('BTC', result)
         self.assertEqual(result['BTC'], 'bitcoin')
 
 
-class TestFetchWithBackoff(unittest.TestCase):
-    def setUp(self):
-        self.tracker, self.db_path = _make_tracker()
-
-    def tearDown(self):
-        os.unlink(self.db_path)
-
+class TestFetchWithBackoff(TrackerTestCase):
     @patch('backend.requests.get')
     def test_success_first_try(self, mock_get):
         mock_resp = MagicMock()
@@ -466,14 +797,36 @@ class TestFetchWithBackoff(unittest.TestCase):
         result = self.tracker._fetch_with_backoff('http://example.com', max_retries=1, initial_delay=0.01)
         self.assertIsNone(result)
 
+    @patch('backend.requests.get')
+    def test_limiter_acquired_per_attempt(self, mock_get):
+        mock_get.return_value = MagicMock(status_code=200)
+        limiter = MagicMock()
+        self.tracker._fetch_with_backoff('http://example.com', limiter=limiter)
+        limiter.acquire.assert_called_once_with()
 
-class TestSearch(unittest.TestCase):
-    def setUp(self):
-        self.tracker, self.db_path = _make_tracker()
 
-    def tearDown(self):
-        os.unlink(self.db_path)
+class TestRateLimiter(unittest.TestCase):
+    @patch('backend.time.sleep')
+    def test_burst_then_waits_for_refill(self, mock_sleep):
+        limiter = RateLimiter(rate=10.0, capacity=2)
+        limiter.acquire()
+        limiter.acquire()
+        mock_sleep.assert_not_called()
+        limiter.acquire()
+        self.assertAlmostEqual(mock_sleep.call_args[0][0], 0.1, delta=0.01)
+
+    @patch('backend.time.sleep')
+    def test_waiters_queue_up(self, mock_sleep):
+        limiter = RateLimiter(rate=10.0, capacity=1)
+        for _ in range(3):
+            limiter.acquire()
+        waits = [c[0][0] for c in mock_sleep.call_args_list]
+        self.assertEqual(len(waits), 2)
+        self.assertAlmostEqual(waits[0], 0.1, delta=0.01)
+        self.assertAlmostEqual(waits[1], 0.2, delta=0.01)
 
+
+class TestSearch(TrackerTestCase):
     def test_popular_assets(self):
         popular = self.tracker.get_popular_assets()
         self.assertGreater(len(popular), 0)
@@ -481,12 +834,25 @@ class TestSearch(unittest.TestCase):
         self.assertIn('AAPL', symbols)
         self.assertIn('BTC', symbols)
 
+    def test_popular_assets_returns_copies(self):
+        self.tracker.get_popular_assets()[0]['symbol'] = 'CHANGED'
+        self.assertEqual(self.tracker.get_popular_assets()[0]['symbol'], 'AAPL')
+
     @patch.object(InvestmentTracker, 'get_available_crypto_symbols',
                   return_value={'BTC': 'bitcoin', 'ETH': 'ethereum'})
     def test_search_crypto(self, mock_crypto):
         results = self.tracker.search_available_assets('BTC', 'crypto')
         self.assertTrue(any(r['symbol'] == 'BTC' for r in results))
 
+    @patch('backend._ticker')
+    def test_search_capped_without_stock_lookup(self, mock_ticker):
+        coins = {f'COIN{i}': f'coin-{i}' for i in range(200)}
+        with patch.object(InvestmentTracker, 'get_available_crypto_symbols', return_value=coins):
+            results = self.tracker.search_available_assets('coin')
+        self.assertEqual(len(results), SEARCH_RESULT_LIMIT)
+        self.assertEqual(results[0]['symbol'], 'COIN0')
+        mock_ticker.assert_not_called()
+
 
 if __name__ == '__main__':
     unittest.main()
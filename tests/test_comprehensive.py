@@ -9,9 +9,12 @@ import tempfile
 import os
 import json
 import sys
+from pathlib import Path
 from unittest.mock import patch, MagicMock
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+_SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if _SRC not in sys.path:
+    sys.path.insert(0, _SRC)
 
 from backend import InvestmentTracker
 
@@ -19,6 +22,17 @@ from backend import InvestmentTracker
 import web_frontend
 from web_frontend import app, _set_current_db_name, _validate_db_name, _safe_error
 
+# Keep tests away from the user's on-disk CoinGecko cache
+_no_disk_cache = patch.object(InvestmentTracker, 'crypto_cache_path', None)
+
+
+def setUpModule():
+    _no_disk_cache.start()
+
+
+def tearDownModule():
+    _no_disk_cache.stop()
+
 
 def _make_tracker():
     """Create a tracker with a temp database."""
@@ -29,27 +43,46 @@ def _make_tracker():
     return tracker, tmp.name
 
 
-class FlaskTestBase(unittest.TestCase):
-    """Base class for Flask API tests."""
+def _remove_db(db_path):
+    """Delete a test database together with its WAL sidecar files."""
+    for suffix in ('', '-wal', '-shm'):
+        Path(db_path + suffix).unlink(missing_ok=True)
 
-    def setUp(self):
-        self.tracker, self.db_path = _make_tracker()
+
+def _clear_tables(tracker):
+    """Empty every table so a shared tracker starts each test clean."""
+    with tracker._write_conn() as conn:
+        for table in ('watchlist', 'price_history', 'transactions', 'assets'):
+            conn.execute(f"DELETE FROM {table}")
+
+
+class FlaskTestBase(unittest.TestCase):
+    """Base class for Flask API tests; one database, tracker and client per class."""
+
+    @classmethod
+    def setUpClass(cls):
+        tracker, cls.db_path = _make_tracker()
+        # Save app state so an in-process run (demo.py) can still serve the real database
+        cls._orig_config = {key: app.config[key] for key in ('DB_NAME', 'TRACKER', 'TESTING')}
+        cls._orig_root = web_frontend.PROJECT_ROOT
+        app.config['TRACKER'] = None  # detach, don't close, the app's own tracker
         app.config['TESTING'] = True
-        self.client = app.test_client()
+        cls.client = app.test_client()
 
         # Point the app at our temp database
-        self.db_name = os.path.basename(self.db_path)
-        # Override PROJECT_ROOT and current db for tests
-        self._orig_root = web_frontend.PROJECT_ROOT
-        web_frontend.PROJECT_ROOT = os.path.dirname(self.db_path)
-        _set_current_db_name(self.db_name)
+        cls.db_name = os.path.basename(cls.db_path)
+        web_frontend.PROJECT_ROOT = os.path.dirname(cls.db_path)
+        _set_current_db_name(cls.db_name, tracker)
 
-    def tearDown(self):
-        web_frontend.PROJECT_ROOT = self._orig_root
-        try:
-            os.unlink(self.db_path)
-        except OSError:
-            pass
+    @classmethod
+    def tearDownClass(cls):
+        web_frontend.close_tracker()
+        web_frontend.PROJECT_ROOT = cls._orig_root
+        app.config.update(cls._orig_config)
+        _remove_db(cls.db_path)
+
+    def setUp(self):
+        _clear_tables(web_frontend.get_tracker())
 
     def _add_asset(self, symbol='AAPL', name='Apple Inc.', asset_type='stock'):
         return self.client.post('/api/assets', json={
@@ -132,6 +165,55 @@ class TestTransactionEndpoints(FlaskTestBase):
         self.assertTrue(data['success'])
         self.assertEqual(len(data['data']), 1)
 
+    @patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True)
+    def test_add_transactions_batch(self, mock_price):
+        self._add_asset()
+        resp = self.client.post('/api/transactions/batch', json={'transactions': [
+            {'asset_symbol': 'AAPL', 'transaction_type': 'buy', 'amount': 10, 'price_per_unit': 150.0},
+            {'asset_symbol': 'AAPL', 'transaction_type': 'sell', 'amount': '4', 'price_per_unit': '160'},
+            {'asset_symbol': 'AAPL', 'transaction_type': 'sell', 'amount': 100, 'price_per_unit': 160.0},
+        ]})
+        data = resp.get_json()
+        self.assertFalse(data['success'])
+        self.assertEqual(data['added'], 2)
+        self.assertEqual(data['details'], [True, True, False])
+        self.assertEqual(len(self.client.get('/api/transactions').get_json()['data']), 2)
+
+    def test_add_transactions_batch_invalid_body(self):
+        resp = self.client.post('/api/transactions/batch', json={'transactions': 'nope'})
+        self.assertEqual(resp.status_code, 400)
+        resp = self.client.post('/api/transactions/batch', json={'transactions': [{'asset_symbol': 'AAPL'}]})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_add_transactions_batch_size_limits(self):
+        resp = self.client.post('/api/transactions/batch', json={'transactions': []})
+        self.assertEqual(resp.status_code, 400)
+        tx = {'asset_symbol': 'AAPL', 'transaction_type': 'buy', 'amount': 1, 'price_per_unit': 1.0}
+        with patch.object(web_frontend, 'MAX_BATCH_SIZE', 2):
+            resp = self.client.post('/api/transactions/batch', json={'transactions': [tx] * 3})
+        self.assertEqual(resp.status_code, 400)
+
+    @patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True)
+    def test_get_transactions_paginated(self, mock_price):
+        self._add_asset()
+        for _ in range(3):
+            self._add_transaction()
+        resp = self.client.get('/api/transactions?limit=2&offset=1')
+        self.assertEqual(len(resp.get_json()['data']), 2)
+        resp = self.client.get('/api/transactions?limit=2&offset=2')
+        self.assertEqual(len(resp.get_json()['data']), 1)
+        resp = self.client.get('/api/transactions?offset=1')
+        data = resp.get_json()
+        self.assertEqual(len(data['data']), 2)
+        self.assertEqual(data['total'], 3)
+        with patch.object(web_frontend, 'MAX_PAGE_SIZE', 2):
+            resp = self.client.get('/api/transactions')
+        self.assertEqual(len(resp.get_json()['data']), 2)
+
+    def test_get_transactions_invalid_pagination(self):
+        self.assertEqual(self.client.get('/api/transactions?limit=abc').status_code, 400)
+        self.assertEqual(self.client.get('/api/transactions?offset=-1').status_code, 400)
+
     def test_add_transaction_missing_fields(self):
         resp = self.client.post('/api/transactions', json={'asset_symbol': 'AAPL'})
         self.assertFalse(resp.get_json()['success'])
@@ -156,6 +238,15 @@ class TestTransactionEndpoints(FlaskTestBase):
         self.assertEqual(len(data['data']), 1)
         self.assertEqual(data['data'][0]['asset_symbol'], 'AAPL')
 
+    @patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True)
+    def test_get_transactions_by_type(self, mock_price):
+        self._add_asset()
+        self._add_transaction('AAPL')
+        self._add_transaction('AAPL', 'sell', 4, 160.0)
+        data = self.client.get('/api/transactions?type=sell').get_json()
+        self.assertEqual([t['transaction_type'] for t in data['data']], ['sell'])
+        self.assertEqual(data['total'], 1)
+
 
 class TestPortfolioEndpoint(FlaskTestBase):
     def test_empty_portfolio(self):
@@ -174,6 +265,48 @@ class TestPortfolioEndpoint(FlaskTestBase):
         self.assertEqual(len(data['data']), 1)
 
 
+class TestConditionalGet(FlaskTestBase):
+    def test_etag_revalidation(self):
+        resp = self.client.get('/api/portfolio')
+        etag = resp.headers['ETag']
+        self.assertEqual(resp.headers['Cache-Control'], 'private, no-cache')
+
+        resp = self.client.get('/api/portfolio', headers={'If-None-Match': etag})
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.data, b'')
+
+    def test_etag_differs_per_query(self):
+        all_txns = self.client.get('/api/transactions').headers['ETag']
+        apple_txns = self.client.get('/api/transactions?symbol=AAPL').headers['ETag']
+        self.assertNotEqual(all_txns, apple_txns)
+
+    def test_etag_not_reused_after_restart(self):
+        etag = self.client.get('/api/portfolio').headers['ETag']
+        # A restarted server starts its write counter from zero again
+        with patch.object(web_frontend, '_instance_id', 'restarted'):
+            resp = self.client.get('/api/portfolio', headers={'If-None-Match': etag})
+        self.assertEqual(resp.status_code, 200)
+
+    @patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True)
+    def test_write_invalidates_etag(self, mock_price):
+        etag = self.client.get('/api/assets').headers['ETag']
+        self._add_asset()
+        resp = self.client.get('/api/assets', headers={'If-None-Match': etag})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.get_json()['data']), 1)
+        self.assertNotEqual(resp.headers['ETag'], etag)
+
+    @patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True)
+    def test_writes_not_stored(self, mock_price):
+        resp = self._add_asset()
+        self.assertEqual(resp.headers['Cache-Control'], 'no-store')
+        self.assertNotIn('Pragma', resp.headers)
+
+    def test_no_cors_headers_by_default(self):
+        resp = self.client.get('/api/assets', headers={'Origin': 'http://example.com'})
+        self.assertNotIn('Access-Control-Allow-Origin', resp.headers)
+
+
 class TestWatchlistEndpoints(FlaskTestBase):
     @patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True)
     def test_watchlist_crud(self, mock_price):
@@ -195,6 +328,14 @@ class TestWatchlistEndpoints(FlaskTestBase):
         resp = self.client.get('/api/watchlist')
         self.assertEqual(len(resp.get_json()['data']), 0)
 
+    @patch.object(InvestmentTracker, 'update_single_asset_price', return_value=True)
+    def test_assets_flag_watched(self, mock_price):
+        self._add_asset()
+        self._add_asset('MSFT', 'Microsoft Corporation')
+        self.client.post('/api/watchlist', json={'symbol': 'MSFT'})
+        assets = self.client.get('/api/assets').get_json()['data']
+        self.assertEqual({a['symbol']: a['in_watchlist'] for a in assets}, {'AAPL': False, 'MSFT': True})
+
     def test_watchlist_no_body(self):
         resp = self.client.post('/api/watchlist', content_type='application/json', data='')
         self.assertIn(resp.status_code, (400, 415))
@@ -243,6 +384,16 @@ class TestSearchEndpoints(FlaskTestBase):
         data = resp.get_json()
         self.assertTrue(data['success'])
 
+    def test_crypto_symbols_payload_memoized(self):
+        crypto_map = {'BTC': 'bitcoin', 'SHIB': 'shiba-inu'}
+        with patch.object(InvestmentTracker, 'get_available_crypto_symbols', return_value=crypto_map):
+            first = self.client.get('/api/crypto-symbols').get_json()['data']
+            cached = web_frontend._crypto_symbols_memo[1]
+            second = self.client.get('/api/crypto-symbols').get_json()['data']
+        self.assertEqual(first, second)
+        self.assertIs(web_frontend._crypto_symbols_memo[1], cached)
+        self.assertIn({'symbol': 'SHIB', 'name': 'Shiba Inu', 'asset_type': 'crypto'}, first)
+
 
 class TestPriceHistoryEndpoint(FlaskTestBase):
     def test_price_history_empty(self):
@@ -259,6 +410,24 @@ class TestDatabaseEndpoints(FlaskTestBase):
         self.assertTrue(data['success'])
         self.assertIsInstance(data['data'], list)
 
+    def test_list_databases_includes_data_folder(self):
+        data_dir = os.path.join(os.path.dirname(self.db_path), 'data')
+        os.makedirs(data_dir, exist_ok=True)
+        extra = os.path.join(data_dir, 'listing_test.db')
+        with open(extra, 'wb') as f:
+            f.write(b'x' * 10)
+        try:
+            data = self.client.get('/api/databases').get_json()['data']
+        finally:
+            os.unlink(extra)
+            try:
+                os.rmdir(data_dir)
+            except OSError:
+                pass
+        by_path = {d['path']: d for d in data}
+        self.assertTrue(by_path[self.db_name]['is_current'])
+        self.assertEqual(by_path[os.path.join('data', 'listing_test.db')]['size'], 10)
+
     def test_get_current_database(self):
         resp = self.client.get('/api/databases/current')
         data = resp.get_json()
@@ -269,9 +438,28 @@ class TestDatabaseEndpoints(FlaskTestBase):
         data = resp.get_json()
         self.assertTrue(data['success'])
         # Cleanup
-        new_db = os.path.join(os.path.dirname(self.db_path), 'test_new.db')
-        if os.path.exists(new_db):
-            os.unlink(new_db)
+        _set_current_db_name(self.db_name)
+        _remove_db(os.path.join(os.path.dirname(self.db_path), 'test_new.db'))
+
+    def test_tracker_reused_across_requests(self):
+        first = web_frontend.get_tracker()
+        self.client.get('/api/assets')
+        self.client.get('/api/portfolio')
+        self.assertIs(web_frontend.get_tracker(), first)
+
+    def test_load_database_swaps_tracker(self):
+        old = web_frontend.get_tracker()
+        other, other_path = _make_tracker()
+        other.close()
+        try:
+            resp = self.client.post('/api/databases/load',
+                                    json={'database': os.path.basename(other_path)})
+            self.assertTrue(resp.get_json()['success'])
+            self.assertIsNot(web_frontend.get_tracker(), old)
+            self.assertEqual(web_frontend.get_tracker().db_path, other_path)
+        finally:
+            _set_current_db_name(self.db_name)
+            _remove_db(other_path)
 
     def test_create_database_no_name(self):
         resp = self.client.post('/api/databases/create', json={'name': ''})
@@ -283,6 +471,22 @@ class TestDatabaseEndpoints(FlaskTestBase):
         self.assertFalse(data['success'])
 
 
+@unittest.skipUnless(web_frontend.orjson, "orjson not installed")
+class TestJSONProvider(unittest.TestCase):
+    def test_uses_orjson(self):
+        self.assertIsInstance(app.json, web_frontend.ORJSONProvider)
+
+    def test_serializes_nan_as_null(self):
+        with app.app_context():
+            resp = app.json.response({'value': float('nan'), 'n': 1})
+        self.assertEqual(json.loads(resp.data), {'value': None, 'n': 1})
+        self.assertEqual(resp.mimetype, 'application/json')
+
+    def test_round_trip(self):
+        payload = {'symbol': 'ÄPL', 'values': [1, 2.5, None]}
+        self.assertEqual(app.json.loads(app.json.dumps(payload)), payload)
+
+
 class TestDbNameValidation(unittest.TestCase):
     def test_valid_names(self):
         self.assertEqual(_validate_db_name('my_portfolio.db'), 'my_portfolio.db')